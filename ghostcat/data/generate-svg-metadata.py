@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+#
+# Usage: generate-svg-metadata.py /path/to/svgs/ output.json
+#
+# Validates every device SVG like tests/check-svg.py does and writes the
+# geometry the MouseMap needs into a JSON file for the gresource bundle. Any
+# malformed SVG fails the build.
+
+import json
+import sys
+from lxml import etree
+from pathlib import Path
+
+from svgmetadata import SVGLogger, check_svg, extract_metadata
+
+svgdir = sys.argv[1]
+outfile = sys.argv[2]
+
+success = True
+metadata = {}
+for path in sorted(Path(svgdir).glob("*.svg")):
+    logger = SVGLogger.get_logger(str(path))
+    logger.setLevel("WARNING")
+    root = etree.parse(str(path)).getroot()
+    buttons, leds = check_svg(root, logger)
+    if not logger.success:
+        success = False
+        continue
+    metadata[path.name] = extract_metadata(root, buttons, leds)
+
+if not success:
+    sys.exit(1)
+
+with open(outfile, "w") as f:
+    json.dump(metadata, f, separators=(",", ":"), sort_keys=True)
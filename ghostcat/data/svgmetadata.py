@@ -0,0 +1,314 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Validates the device SVGs and extracts what the MouseMap needs to know
+about them: the bounding boxes of the button and LED elements, their leaders
+and paths, the text alignment of the leaders and the number of buttons and
+LEDs. Used by generate-svg-metadata.py at build time and by
+tests/check-svg.py."""
+
+import logging
+import math
+import re
+
+ns = {"svg": "http://www.w3.org/2000/svg"}
+style_query = '//svg:rect[@id="{}"][contains(@style, "{}")]'
+
+# Elements whose geometry is not drawn where they are defined
+_NOT_RENDERED = {"defs", "clipPath", "mask", "marker", "pattern", "symbol"}
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+_PATH_TOKEN = re.compile(rf"[MmLlHhVvCcSsQqTtAaZz]|{_NUMBER}")
+
+_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+class SVGLogger(logging.Logger):
+    def __init__(self, name, level=logging.NOTSET):
+        self.success = True
+        return super().__init__(name, level)
+
+    def error(self, msg, *args, **kwargs):
+        self.success = False
+        return super().error(msg, *args, **kwargs)
+
+    @classmethod
+    def get_logger(cls, path):
+        logging.setLoggerClass(SVGLogger)
+        logging.basicConfig(level=logging.DEBUG)
+        return logging.getLogger(path)
+
+
+def check_size(root, logger):
+    width = float(root.attrib["width"])
+    height = float(root.attrib["height"])
+    if not 400 <= width <= 500:
+        logger.error(f"Width is outside of range: {width}")
+    if not 400 <= height <= 500:
+        logger.error(f"Height is outside of range: {height}")
+
+
+def check_layers(root, logger):
+    """
+    Check there are layers (well, groups) for the components we require.
+    """
+    layer_ids = [g.attrib["id"] for g in root.iterfind("svg:g", ns)]
+
+    for layer in ["Device", "Buttons", "LEDs"]:
+        if layer not in layer_ids:
+            logger.error(f"Missing layer: {layer}")
+
+
+def check_elements(root, prefix, logger, required=0):
+    """
+    Checks for elements of the form 'prefixN' in the root tag. Any elements
+    found must be consecutive or an warning is printed, i.e. if there's a
+    'button8' there has to be a 'button7'.
+
+    If required is nonzero, an error is logged for any missing element with
+    an index less than required.
+
+    Returns the number of elements found, i.e. the highest index plus one.
+    """
+
+    # elements can be paths and rects
+    # This includes leaders and lines
+    element_ids = []
+    for element in ["path", "rect", "g", "circle"]:
+        element_ids += [
+            p.attrib["id"]
+            for p in root.xpath(f"//svg:{element}", namespaces=ns)
+            if p.attrib["id"].startswith(prefix)
+        ]
+
+    idx = 0
+    highest = -1
+    for idx in range(20):
+        e = f"{prefix}{idx}"
+        previous = f"{prefix}{idx - 1}"
+        leader = f"{prefix}{idx}-leader"
+        path = f"{prefix}{idx}-path"
+        if e in element_ids:
+            highest = idx
+            if idx > 0 and previous not in element_ids:
+                logger.warning(f"Non-consecutive {prefix}: {e}")
+
+            if leader not in element_ids:
+                logger.error(f"Missing {leader} for {e}")
+            else:
+                element = root.xpath(
+                    style_query.format(leader, "text-align"), namespaces=ns
+                )
+                if element is None or len(element) != 1 or element[0] is None:
+                    logger.error(f"Missing style property for {leader}")
+
+            if path not in element_ids:
+                logger.error(f"Missing {path} for {e}")
+        elif leader in element_ids:
+            logger.error(f"Have {leader} but not {e}")
+        elif path in element_ids:
+            logger.error(f"Have {path} but not {e}")
+        elif idx < required:
+            logger.error(f"Missing {prefix}: {e}")
+
+    logger.info(f"Found {highest + 1} {prefix}s")
+    return highest + 1
+
+
+def check_svg(root, logger):
+    """Runs all checks on the given SVG root element. Returns the number of
+    buttons and LEDs found."""
+    check_size(root, logger)
+    check_layers(root, logger)
+    buttons = check_elements(root, "button", logger)
+    leds = check_elements(root, "led", logger)
+    return buttons, leds
+
+
+def _multiply(a, b):
+    # Returns the affine transform that applies b, then a.
+    return (
+        a[0] * b[0] + a[2] * b[1],
+        a[1] * b[0] + a[3] * b[1],
+        a[0] * b[2] + a[2] * b[3],
+        a[1] * b[2] + a[3] * b[3],
+        a[0] * b[4] + a[2] * b[5] + a[4],
+        a[1] * b[4] + a[3] * b[5] + a[5],
+    )
+
+
+def _parse_transform(transform):
+    matrix = _IDENTITY
+    for name, args in _TRANSFORM.findall(transform or ""):
+        v = [float(n) for n in re.findall(_NUMBER, args)]
+        if name == "matrix":
+            m = tuple(v)
+        elif name == "translate":
+            m = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == "scale":
+            m = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == "rotate":
+            a = math.radians(v[0])
+            m = (math.cos(a), math.sin(a), -math.sin(a), math.cos(a), 0.0, 0.0)
+            if len(v) == 3:
+                m = _multiply(
+                    _multiply((1.0, 0.0, 0.0, 1.0, v[1], v[2]), m),
+                    (1.0, 0.0, 0.0, 1.0, -v[1], -v[2]),
+                )
+        elif name == "skewX":
+            m = (1.0, 0.0, math.tan(math.radians(v[0])), 1.0, 0.0, 0.0)
+        else:
+            m = (1.0, math.tan(math.radians(v[0])), 0.0, 1.0, 0.0, 0.0)
+        matrix = _multiply(matrix, m)
+    return matrix
+
+
+def _path_points(d):
+    # Yields the end and control points of the given path data, whose hull
+    # contains the path. Arcs yield the boxes around their end points spanned
+    # by their radii.
+    tokens = _PATH_TOKEN.findall(d or "")
+    x = y = start_x = start_y = 0.0
+    command = None
+    i = 0
+    arity = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7}
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in "Zz":
+                x, y = start_x, start_y
+                continue
+        upper = command.upper()
+        args = [float(t) for t in tokens[i : i + arity[upper]]]
+        i += arity[upper]
+        dx, dy = (x, y) if command.islower() else (0.0, 0.0)
+        if upper == "H":
+            x = args[0] + dx
+        elif upper == "V":
+            y = args[0] + dy
+        elif upper == "A":
+            rx, ry = abs(args[0]), abs(args[1])
+            yield from ((x - rx, y - ry), (x + rx, y + ry))
+            x, y = args[5] + dx, args[6] + dy
+            yield from ((x - rx, y - ry), (x + rx, y + ry))
+        else:
+            for j in range(0, len(args) - 2, 2):
+                yield args[j] + dx, args[j + 1] + dy
+            x, y = args[-2] + dx, args[-1] + dy
+        yield x, y
+        if upper == "M":
+            start_x, start_y = x, y
+            # Coordinates following a moveto are implicit linetos
+            command = "l" if command == "m" else "L"
+
+
+def _shape_points(element, tag):
+    # Yields the points whose hull contains the given shape, in its own
+    # coordinate system.
+    def attr(name):
+        return float(element.get(name, 0))
+
+    if tag in ("rect", "image"):
+        x, y = attr("x"), attr("y")
+        w, h = attr("width"), attr("height")
+        yield from ((x, y), (x + w, y + h), (x + w, y), (x, y + h))
+    elif tag in ("circle", "ellipse"):
+        cx, cy = attr("cx"), attr("cy")
+        rx = attr("r") if tag == "circle" else attr("rx")
+        ry = attr("r") if tag == "circle" else attr("ry")
+        yield from ((cx - rx, cy - ry), (cx + rx, cy + ry))
+        yield from ((cx - rx, cy + ry), (cx + rx, cy - ry))
+    elif tag == "line":
+        yield attr("x1"), attr("y1")
+        yield attr("x2"), attr("y2")
+    elif tag in ("polyline", "polygon"):
+        v = [float(n) for n in re.findall(_NUMBER, element.get("points", ""))]
+        yield from zip(v[0::2], v[1::2])
+    elif tag == "path":
+        yield from _path_points(element.get("d"))
+
+
+def _local_name(element):
+    tag = element.tag
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else None
+
+
+def _bounding_box(element, matrix):
+    # Returns the bounding box of the element and its descendants in the
+    # coordinate system of the given transform, as (x0, y0, x1, y1) or None.
+    tag = _local_name(element)
+    if tag is None or tag in _NOT_RENDERED:
+        return None
+    matrix = _multiply(matrix, _parse_transform(element.get("transform")))
+
+    boxes = []
+    a, b, c, d, e, f = matrix
+    points = [
+        (a * x + c * y + e, b * x + d * y + f) for x, y in _shape_points(element, tag)
+    ]
+    if points:
+        xs, ys = zip(*points)
+        boxes.append((min(xs), min(ys), max(xs), max(ys)))
+    for child in element:
+        box = _bounding_box(child, matrix)
+        if box is not None:
+            boxes.append(box)
+    if not boxes:
+        return None
+    x0s, y0s, x1s, y1s = zip(*boxes)
+    return min(x0s), min(y0s), max(x1s), max(y1s)
+
+
+def _root_matrix(root):
+    # Maps the viewBox, if any, onto the width and height of the SVG.
+    viewbox = [float(n) for n in re.findall(_NUMBER, root.get("viewBox", ""))]
+    if len(viewbox) != 4 or not viewbox[2] or not viewbox[3]:
+        return _IDENTITY
+    sx = float(root.attrib["width"]) / viewbox[2]
+    sy = float(root.attrib["height"]) / viewbox[3]
+    return (sx, 0.0, 0.0, sy, -viewbox[0] * sx, -viewbox[1] * sy)
+
+
+def _ancestor_matrix(element, root_matrix):
+    matrix = root_matrix
+    for ancestor in reversed(list(element.iterancestors())):
+        matrix = _multiply(matrix, _parse_transform(ancestor.get("transform")))
+    return matrix
+
+
+def extract_metadata(root, buttons, leds):
+    """Returns the metadata of the given SVG root element as a dict that can
+    be serialized to JSON. The geometry of each element is given in pixels
+    of the SVG's natural size, the way librsvg's get_position_sub() and
+    get_dimensions_sub() return it."""
+    root_matrix = _root_matrix(root)
+    element_re = re.compile(r"^(button|led)\d+(-leader|-path)?$")
+    elements = {}
+    for element in root.iter():
+        svg_id = element.get("id")
+        if svg_id is None or not element_re.match(svg_id):
+            continue
+        box = _bounding_box(element, _ancestor_matrix(element, root_matrix))
+        if box is None:
+            continue
+        entry = {
+            "x": round(box[0]),
+            "y": round(box[1]),
+            "width": round(box[2] - box[0]),
+            "height": round(box[3] - box[1]),
+        }
+        if svg_id.endswith("-leader"):
+            style = element.get("style", "")
+            match = re.search(r"text-align\s*:\s*([a-z]+)", style)
+            if match:
+                entry["text-align"] = match.group(1)
+        elements[svg_id] = entry
+
+    return {
+        "width": float(root.attrib["width"]),
+        "height": float(root.attrib["height"]),
+        "buttons": buttons,
+        "leds": leds,
+        "elements": elements,
+    }
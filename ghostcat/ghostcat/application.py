@@ -1,8 +1,11 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import sys
 from typing import Optional
 
-from .ghostcatd import Ratbagd
+from . import devicecache, startuptrace
+from .profiler import get_profiler
+from .ghostcatd import RatbagError, Ratbagd, RatbagdDBusTimeoutError
 from .window import Window
 
 import gi
@@ -62,8 +65,30 @@ class Application(Gtk.Application):
 
     def init_ghostcatd(self) -> Ratbagd:
         if self._ghostcatd is None:
-            self._ratbag = Ratbagd(self._required_ghostcatd_version)
-        return self._ratbag
+            # Writes are held back briefly so that dragging a DPI slider or
+            # picking a colour sends only the value the user settled on.
+            self._ghostcatd = Ratbagd(
+                self._required_ghostcatd_version,
+                asynchronous=True,
+                write_delay_ms=250,
+            )
+            startuptrace.mark("ghostcatd connected")
+        return self._ghostcatd
+
+    def do_shutdown(self) -> None:
+        """This function is called when the application quits, after the
+        last window was closed or destroyed."""
+        if self._ghostcatd is not None:
+            # Send the changes still held back by the write delay
+            try:
+                self._ghostcatd.flush()
+            except (GLib.Error, RatbagError, RatbagdDBusTimeoutError) as e:
+                print(f"Cannot write the last changes: {e}", file=sys.stderr)
+        devicecache.flush()
+        # Write the trace of a recording still running, e.g. one started
+        # by GHOSTCAT_PROFILE
+        get_profiler().stop()
+        Gtk.Application.do_shutdown(self)
 
     def do_activate(self) -> None:
         """This function is called when the user requests a new window to be
@@ -73,11 +98,20 @@ class Application(Gtk.Application):
 
     def _build_app_menu(self) -> None:
         # Set up the app menu
-        actions = [("about", self._about), ("quit", self._quit)]
+        actions = [
+            ("about", self._about),
+            ("quit", self._quit),
+            ("profiler", self._toggle_profiler),
+        ]
         for name, callback in actions:
             action = Gio.SimpleAction.new(name, None)
             action.connect("activate", callback)
             self.add_action(action)
+        self.set_accels_for_action("app.profiler", ["<Primary><Shift>p"])
+
+    def _toggle_profiler(self, action: Gio.SimpleAction, param: None) -> None:
+        # Developer tool, see profiler.py
+        get_profiler().toggle()
 
     def _about(self, action: Gio.SimpleAction, param: None) -> None:
         # Set up the about dialog.
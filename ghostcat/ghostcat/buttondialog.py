@@ -3,7 +3,7 @@
 import sys
 
 from gettext import gettext as _
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from .ghostcatd import RatbagdButton, RatbagdMacro, RatbagDeviceType
 
@@ -12,6 +12,81 @@ import gi
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gdk, GObject, Gtk  # noqa
 
+# A mapping the ButtonDialog offers, as (action type, value)
+_MappingKey = Tuple[
+    RatbagdButton.ActionType, Union[int, RatbagdButton.ActionSpecial, None]
+]
+# The description and section of every mapping offered so far
+_mappings: Dict[_MappingKey, Tuple[str, str]] = {}
+# Maps every prefix of the casefolded words of the descriptions to their
+# mappings
+_search_index: Dict[str, Set[_MappingKey]] = {}
+
+
+def _add_mapping(key: _MappingKey, description: str, section: str) -> None:
+    # Adds a mapping to the process-wide list and the search index.
+    if key in _mappings:
+        return
+    _mappings[key] = (description, section)
+    for word in description.casefold().split(" "):
+        for end in range(1, len(word) + 1):
+            _search_index.setdefault(word[:end], set()).add(key)
+
+
+def _get_button_mapping(index: int) -> _MappingKey:
+    # Returns the mapping to the given button, adding it if necessary.
+    key = (RatbagdButton.ActionType.BUTTON, index + 1)
+    if key not in _mappings:
+        # Translators: the {} will be replaced with the button index, e.g.
+        # "Button 1 click".
+        name = _("Button {} click").format(index)
+        if index in RatbagdButton.BUTTON_DESCRIPTION:
+            description = _(RatbagdButton.BUTTON_DESCRIPTION[index])
+        else:
+            description = name
+        # Translators: section header for mapping one button's click to another.
+        _add_mapping(key, description, _("Button mapping"))
+    return key
+
+
+def _get_other_mappings() -> List[_MappingKey]:
+    # Returns the special mappings and the one disabling the button, adding
+    # them the first time.
+    keys = []
+    for special, name in RatbagdButton.SPECIAL_DESCRIPTION.items():
+        if name in ["Unknown", "Invalid"]:
+            continue
+        key = (RatbagdButton.ActionType.SPECIAL, special)
+        # Translators: section header for assigning special functions to buttons.
+        _add_mapping(key, _(name), _("Special mapping"))
+        keys.append(key)
+    key = (RatbagdButton.ActionType.NONE, None)
+    _add_mapping(key, _("Disable"), _("Other"))
+    keys.append(key)
+    return keys
+
+
+def _search_mappings(search: str) -> Optional[Set[_MappingKey]]:
+    # Returns the mappings whose description has a word starting with every
+    # term of the given search, or None if every mapping matches.
+    matches = None
+    for term in search.casefold().split(" "):
+        if not term:
+            continue
+        term_matches = _search_index.get(term, set())
+        matches = term_matches if matches is None else matches & term_matches
+    return matches
+
+
+def _matches_words(text: str, search: str) -> bool:
+    # Returns whether the given text has a word starting with every term of
+    # the given search, like _search_mappings() for a text not in the index.
+    words = text.casefold().split(" ")
+    return all(
+        any(word.startswith(term) for word in words)
+        for term in search.casefold().split(" ")
+    )
+
 
 @Gtk.Template(resource_path="/org/freedesktop/GhostCAT/ui/ButtonRow.ui")
 class ButtonRow(Gtk.ListBoxRow):
@@ -54,6 +129,21 @@ class ButtonRow(Gtk.ListBoxRow):
         return self.description_label.get_text()
 
 
+# The ButtonRows not in a ButtonDialog, by their mapping. A dialog takes the
+# rows it shows from here and puts them back when it is destroyed, so they
+# are built once per process.
+_row_pool: Dict[_MappingKey, ButtonRow] = {}
+
+
+def _take_row(key: _MappingKey) -> ButtonRow:
+    # Returns the unused row of the given mapping, creating it if necessary.
+    try:
+        return _row_pool.pop(key)
+    except KeyError:
+        description, section = _mappings[key]
+        return ButtonRow(description, section, *key)
+
+
 @Gtk.Template(resource_path="/org/freedesktop/GhostCAT/ui/ButtonDialog.ui")
 class ButtonDialog(Gtk.Dialog):
     """A Gtk.Dialog subclass to implement the dialog that shows the
@@ -94,6 +184,8 @@ class ButtonDialog(Gtk.Dialog):
         @param devicetype The type of this device, as ghostcatd.RatbagDeviceType.
         """
         Gtk.Dialog.__init__(self, *args, **kwargs)
+        self._rows: Dict[_MappingKey, ButtonRow] = {}
+        self._visible_rows: Set[_MappingKey] = set()
         self._grab_pointer: Optional[Gdk.Device] = None
         self._current_macro: Optional[RatbagdMacro] = None
         self._button = ghostcatd_button
@@ -141,50 +233,24 @@ class ButtonDialog(Gtk.Dialog):
     def _init_other_buttons_ui(self, buttons: List[RatbagdButton]) -> None:
         # Shows the listbox to map non-primary buttons.
         self.listbox.set_header_func(self._listbox_header_func)
-        self.listbox.set_filter_func(self._listbox_filter_func)
         self.listbox.set_placeholder(self.empty_search_placeholder)
-        self.search_entry.connect(
-            "notify::text", lambda o, p: self.listbox.invalidate_filter()
-        )
+        self.search_entry.connect("notify::text", self._on_search_text_changed)
 
-        i = 0
-        for button in buttons:
-            key, name = self._get_button_name_and_description(button)
-            # Translators: section header for mapping one button's click to another.
-            row = ButtonRow(
-                name,
-                _("Button mapping"),
-                RatbagdButton.ActionType.BUTTON,
-                button.index + 1,
-            )
+        keys = [_get_button_mapping(button.index) for button in buttons]
+        keys += _get_other_mappings()
+        for i, key in enumerate(keys):
+            action_type, value = key
+            row = _take_row(key)
             self.listbox.insert(row, i)
-            if (
-                self._action_type == RatbagdButton.ActionType.BUTTON
-                and button.index + 1 == self._button.mapping
-            ):
+            self._rows[key] = row
+            if action_type == RatbagdButton.ActionType.NONE:
+                row.set_sensitive(
+                    RatbagdButton.ActionType.NONE in self._button.action_types
+                )
+            if action_type == self._action_type and value == self._mapping:
                 self.listbox.select_row(row)
-            i += 1
-        for key, name in RatbagdButton.SPECIAL_DESCRIPTION.items():
-            if name in ["Unknown", "Invalid"]:
-                continue
-            # Translators: section header for assigning special functions to buttons.
-            row = ButtonRow(
-                _(name), _("Special mapping"), RatbagdButton.ActionType.SPECIAL, key
-            )
-            self.listbox.insert(row, i)
-            if (
-                self._action_type == RatbagdButton.ActionType.SPECIAL
-                and key == self._mapping
-            ):
-                self.listbox.select_row(row)
-            i += 1
-
-        row = ButtonRow(_("Disable"), _("Other"), RatbagdButton.ActionType.NONE, None)
-        row.set_sensitive(RatbagdButton.ActionType.NONE in self._button.action_types)
-        self.listbox.insert(row, i)
-        i += 1
-        if self._action_type == RatbagdButton.ActionType.NONE:
-            self.listbox.select_row(row)
+        self._visible_rows = set(self._rows)
+        self.connect("destroy", self._on_destroy)
 
         if self._action_type == RatbagdButton.ActionType.MACRO:
             self._create_current_macro(macro=self._mapping)
@@ -236,30 +302,32 @@ class ButtonDialog(Gtk.Dialog):
         row.set_header(box)
         box.show_all()
 
-    def _listbox_filter_func(self, row: Gtk.ListBoxRow) -> bool:
-        # Filters the list box with the text from the search entry.
-        if self.search_entry.get_text_length() == 0:
-            return True
-
-        if row is not self.row_keystroke:
-            description = row.description.casefold()
-        else:
-            description = self.row_keystroke_label.get_label().casefold()
-        search = self.search_entry.get_text().casefold()
-
-        return all(term in description for term in search.split(" "))
-
-    def _get_button_name_and_description(
-        self, button: RatbagdButton
-    ) -> Tuple[str, str]:
-        # Translators: the {} will be replaced with the button index, e.g.
-        # "Button 1 click".
-        name = _("Button {} click").format(button.index)
-        if button.index in RatbagdButton.BUTTON_DESCRIPTION:
-            description = _(RatbagdButton.BUTTON_DESCRIPTION[button.index])
+    def _on_search_text_changed(
+        self, entry: Gtk.SearchEntry, pspec: GObject.ParamSpec
+    ) -> None:
+        # Filters the list box with the text from the search entry. Only the
+        # rows that start or stop matching are touched.
+        search = self.search_entry.get_text()
+        matches = _search_mappings(search)
+        if matches is None:
+            visible_rows = set(self._rows)
         else:
-            description = name
-        return name, description
+            visible_rows = {key for key in matches if key in self._rows}
+        for key in visible_rows ^ self._visible_rows:
+            self._rows[key].set_visible(key in visible_rows)
+        self._visible_rows = visible_rows
+
+        keystroke = self.row_keystroke_label.get_label()
+        self.row_keystroke.set_visible(_matches_words(keystroke, search))
+
+    def _on_destroy(self, dialog: Gtk.Dialog) -> None:
+        # Puts the rows back into the pool before the list box destroys them.
+        for key, row in self._rows.items():
+            self.listbox.remove(row)
+            row.set_visible(True)
+            row.set_sensitive(True)
+            _row_pool[key] = row
+        self._rows = {}
 
     def _grab_seat(self) -> bool:
         """
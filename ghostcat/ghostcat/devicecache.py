@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import hashlib
+import os
+import sys
+
+from typing import Optional
+
+from .ghostcatd import RatbagdDevice, RatbagdUnavailableError
+
+from gi.repository import GLib  # noqa
+
+SNAPSHOT_TYPE = "(a{oa{sa{sv}}})"
+
+# How long save() waits for another device before writing, in ms
+SAVE_DELAY_MS = 2000
+
+# The device passed to save() and not written yet
+_pending: Optional[RatbagdDevice] = None
+_pending_source = 0
+
+
+def get_cache_dir() -> str:
+    return os.path.join(GLib.get_user_cache_dir(), "ghostcat", "devices")
+
+
+def _get_cache_path(model: str, firmware_version: str) -> str:
+    key = f"{model}\0{firmware_version}".encode()
+    return os.path.join(get_cache_dir(), hashlib.sha1(key).hexdigest() + ".gvariant")
+
+
+def save(device: RatbagdDevice) -> None:
+    """Stores the current state of the device so the next launch can show it
+    before ghostcatd is ready, see load_last(). Devices are told apart by
+    their model and firmware version.
+
+    The device is written once no other device was saved for SAVE_DELAY_MS,
+    e.g. while switching through devices, or on flush()."""
+    global _pending, _pending_source
+
+    if device.stale:
+        return
+
+    _pending = device
+    if _pending_source:
+        GLib.source_remove(_pending_source)
+    _pending_source = GLib.timeout_add(SAVE_DELAY_MS, _on_save_timeout)
+
+
+def _on_save_timeout() -> bool:
+    global _pending_source
+
+    _pending_source = 0
+    flush()
+    return False
+
+
+def flush() -> None:
+    """Writes the device last passed to save() right away, if it wasn't
+    written yet. Call this before quitting."""
+    global _pending, _pending_source
+
+    if _pending_source:
+        GLib.source_remove(_pending_source)
+        _pending_source = 0
+    device, _pending = _pending, None
+    if device is None:
+        return
+
+    try:
+        path = _get_cache_path(device.model, device.firmware_version or "")
+        data = device.get_snapshot().get_data_as_bytes().get_data()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written to a temporary file and renamed, a crash never leaves a
+        # truncated snapshot behind.
+        GLib.file_set_contents(path, data)
+    except (OSError, GLib.Error) as e:
+        print(f"Cannot cache device {device.name}: {e}", file=sys.stderr)
+
+
+def load_last() -> Optional[RatbagdDevice]:
+    """Returns a stale RatbagdDevice for the most recently saved device, or
+    None if there is none or it cannot be read."""
+    try:
+        entries = [e for e in os.scandir(get_cache_dir()) if e.is_file()]
+    except OSError:
+        return None
+    if not entries:
+        return None
+
+    path = max(entries, key=lambda e: e.stat().st_mtime).path
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        snapshot = GLib.Variant.new_from_bytes(
+            GLib.VariantType.new(SNAPSHOT_TYPE), GLib.Bytes.new(data), False
+        )
+        # Don't trust anything on disk to be well-formed
+        if not snapshot.is_normal_form():
+            raise ValueError("not in normal form")
+        return RatbagdDevice.new_from_snapshot(snapshot)
+    except (
+        OSError,
+        KeyError,
+        TypeError,
+        ValueError,
+        GLib.Error,
+        RatbagdUnavailableError,
+    ) as e:
+        print(f"Ignoring cached device {path}: {e}", file=sys.stderr)
+        return None
@@ -1,15 +1,17 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
-from ghostcat.svg import get_svg
+from ghostcat.thumbnails import load_thumbnail
 
 import sys
 
+from typing import Optional
+
 import gi
 
 from .ghostcatd import RatbagdDevice
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import GdkPixbuf, GObject, Gtk, Rsvg  # noqa
+from gi.repository import GdkPixbuf, GObject, Gtk  # noqa
 
 
 @Gtk.Template(resource_path="/org/freedesktop/GhostCAT/ui/DeviceRow.ui")
@@ -34,32 +36,18 @@ class DeviceRow(Gtk.ListBoxRow):
         else:
             self.title.set_text(device.name)
 
-        try:
-            svg_bytes = get_svg(device.model)
-            assert svg_bytes is not None
-            handle = Rsvg.Handle.new_from_data(svg_bytes)
-            assert handle is not None
-            svg = handle.get_pixbuf_sub("#Device")
-            handle.close()
-            if svg is None:
-                print(
-                    f"Device {device.name}'s SVG is incompatible",
-                    file=sys.stderr,
-                )
-            else:
-                svg = svg.scale_simple(50, 50, GdkPixbuf.InterpType.BILINEAR)
-                if svg is None:
-                    print("Cannot resize device SVG", file=sys.stderr)
-                else:
-                    self.image.set_from_pixbuf(svg)
-        except FileNotFoundError:
-            print(
-                f"Device {device.name} has no image or its path is invalid",
-                file=sys.stderr,
-            )
+        # Rendering the SVG is slow, the thumbnail is cached across
+        # sessions and shows up once rendered on the first launch.
+        load_thumbnail(device.model, self._on_thumbnail_loaded)
 
         self.show_all()
 
+    def _on_thumbnail_loaded(self, pixbuf: Optional[GdkPixbuf.Pixbuf]) -> None:
+        if pixbuf is None:
+            print(f"Device {self._device.name}'s SVG is incompatible", file=sys.stderr)
+        else:
+            self.image.set_from_pixbuf(pixbuf)
+
     @GObject.Property
     def device(self) -> RatbagdDevice:
         return self._device
@@ -19,15 +19,19 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import asyncio
+import atexit
+import contextlib
 import os
 import sys
 import hashlib
+import time
+import weakref
 
 from enum import IntEnum
-from evdev import ecodes
 from gettext import gettext as _
 from gi.repository import Gio, GLib, GObject
-from typing import List, Optional, Tuple, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 
 # Deferred translations, see https://docs.python.org/3/library/gettext.html#deferred-translations
@@ -36,6 +40,10 @@ def N_(x):
 
 
 def evcode_to_str(evcode: int) -> str:
+    # evdev builds its tables of all key codes when imported, only pay for
+    # that once a key is shown.
+    from evdev import ecodes
+
     # Values in ecodes.keys are stored as either a str or list[str].
     value = ecodes.keys[evcode]
     if isinstance(value, list):
@@ -140,13 +148,241 @@ EXCEPTION_TABLE = {
 }
 
 
+class DBusCallStats:
+    """Counters and a latency histogram for one kind of D-Bus call."""
+
+    """Upper bounds of the histogram buckets in ms, the last bucket takes
+    everything above."""
+    BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(self.BUCKETS) + 1)
+
+    def record(self, elapsed_ms, error=None):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if isinstance(error, RatbagdDBusTimeoutError) or (
+            isinstance(error, GLib.Error) and error.code == Gio.IOErrorEnum.TIMED_OUT
+        ):
+            self.timeouts += 1
+        elif error is not None:
+            self.errors += 1
+        for i, bound in enumerate(self.BUCKETS):
+            if elapsed_ms <= bound:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+
+class DBusStats:
+    """Collects a DBusCallStats for every method call, property write and
+    proxy construction made by the objects in this module, see
+    enable_dbus_stats(). Calls are named after the object's interface, e.g.
+    "Device.Commit", "Resolution.Resolution (set)" or "Profile (proxy)".
+    Dispatching a signal to our objects, including all handlers that run
+    as a result, is recorded as e.g. "Profile.PropertiesChanged (signal)".
+
+    Every callable in listeners is called with the name, the start and end
+    time.perf_counter() values and the error of each recorded call.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, DBusCallStats] = {}
+        self.listeners: List[Callable] = []
+        self.dump_at_exit = False
+
+    def record(self, name, start, error=None):
+        """Records a call that started at the given time.perf_counter()
+        value and just finished, with error being the exception it raised,
+        if any."""
+        end = time.perf_counter()
+        try:
+            stats = self.calls[name]
+        except KeyError:
+            stats = self.calls[name] = DBusCallStats()
+        stats.record((end - start) * 1000, error)
+        for listener in self.listeners:
+            listener(name, start, end, error)
+
+    def dump(self, file=None):
+        """Prints a table of all calls, slowest in total first."""
+        file = file or sys.stderr
+        print(
+            f"{'D-Bus call':<40} {'count':>6} {'errors':>6} {'timeouts':>8} "
+            f"{'total ms':>9} {'max ms':>8}",
+            file=file,
+        )
+        labels = [f"<={b}ms" for b in DBusCallStats.BUCKETS]
+        labels.append(f">{DBusCallStats.BUCKETS[-1]}ms")
+        for name, stats in sorted(self.calls.items(), key=lambda c: -c[1].total_ms):
+            print(
+                f"{name:<40} {stats.count:>6} {stats.errors:>6} {stats.timeouts:>8} "
+                f"{stats.total_ms:>9.2f} {stats.max_ms:>8.2f}",
+                file=file,
+            )
+            buckets = (
+                f"{label}: {n}" for label, n in zip(labels, stats.histogram) if n
+            )
+            print(f"    {', '.join(buckets)}", file=file)
+
+
+def enable_dbus_stats(dump_at_exit=False):
+    """Starts collecting statistics about the D-Bus traffic of this process
+    and returns the DBusStats. Calling it again returns the same object.
+
+    Statistics are also enabled, and printed to stderr when the process
+    exits, if the RATBAG_DBUS_STATS environment variable is set. While
+    disabled, the only cost is one attribute check per call.
+    """
+    if _RatbagdDBus._stats is None:
+        _RatbagdDBus._stats = DBusStats()
+    if dump_at_exit and not _RatbagdDBus._stats.dump_at_exit:
+        _RatbagdDBus._stats.dump_at_exit = True
+        atexit.register(_RatbagdDBus._stats.dump)
+    return _RatbagdDBus._stats
+
+
+def disable_dbus_stats():
+    """Stops collecting the statistics started by enable_dbus_stats(),
+    unless they still have listeners or are printed when the process
+    exits."""
+    stats = _RatbagdDBus._stats
+    if stats is not None and not stats.listeners and not stats.dump_at_exit:
+        _RatbagdDBus._stats = None
+
+
+def add_signal_listener(listener):
+    """Calls listener(object_path, interface, signal, parameters) for every
+    signal from ghostcatd, before the objects of this module are updated.
+    The signals arrive through the subscription these objects share, so
+    this adds no match rules. Only signals received after the first object
+    was created are seen."""
+    _RatbagdDBus._signal_listeners.append(listener)
+
+
+def remove_signal_listener(listener):
+    _RatbagdDBus._signal_listeners.remove(listener)
+
+
+class _SavedProxy:
+    """Takes the place of the Gio.DBusProxy of an object created from a saved
+    snapshot, see RatbagdDevice.new_from_snapshot(). It only holds the
+    properties, such objects have no counterpart on the bus."""
+
+    def __init__(self, properties):
+        self._properties = dict(properties)
+
+    def get_cached_property(self, name):
+        return self._properties.get(name)
+
+    def set_cached_property(self, name, value):
+        if value is None:
+            self._properties.pop(name, None)
+        else:
+            self._properties[name] = value
+
+    def get_cached_property_names(self):
+        return list(self._properties)
+
+    def get_name_owner(self):
+        return None
+
+    def _not_connected(self):
+        return GLib.Error.new_literal(
+            Gio.io_error_quark(),
+            "A cached device cannot be changed",
+            Gio.IOErrorEnum.NOT_CONNECTED,
+        )
+
+    def call_sync(self, *args):
+        raise self._not_connected()
+
+    def call(self, method, parameters, flags, timeout, cancellable, callback, data):
+        # Fails from the main loop like a call to a vanished ghostcatd, the
+        # error takes the place of the Gio.AsyncResult.
+        def on_idle():
+            callback(self, self._not_connected(), data)
+            return False
+
+        GLib.idle_add(on_idle)
+
+    def call_finish(self, result):
+        raise result
+
+
+# A property of an object, as (object path, interface, property name)
+_PropertyKey = Tuple[str, str, str]
+
+
 class _RatbagdDBus(GObject.GObject):
     _dbus = None
+    _has_object_manager = True
+    # The object whose _new_children() is creating objects, they take over
+    # its settings
+    _creator = None
+    # The GetManagedObjects() reply while _new_children() is building part
+    # of the tree, as {object path: {interface: {property: GLib.Variant}}},
+    # and the unique bus name of the ghostcatd instance that sent it.
+    _snapshot = None
+    _snapshot_owner = None
+    # The last GetManagedObjects() reply and its sender, kept to create the
+    # lazily created children from. Any signal from ghostcatd may mean it is
+    # outdated, so it is dropped on the first one.
+    _last_snapshot = None
+    _last_snapshot_owner = None
+    # Set while RatbagdDevice.new_from_snapshot() builds objects from a
+    # snapshot saved earlier, rather than from ghostcatd's current state.
+    _snapshot_is_saved = False
+    # All signals from ghostcatd arrive through a single subscription on the
+    # bus and are routed to the objects for their path, instead of each proxy
+    # adding its own match rules and handlers.
+    _signal_subscription = 0
+    _objects_by_path: Dict[str, List[weakref.ref]] = {}
+    # PropertiesChanged not delivered yet, as
+    # {object path: {interface: {property: GLib.Variant}}}. A resync emits
+    # many of them at once, each object gets them merged in one call.
+    _pending_changes: Dict[str, Dict[str, Dict[str, GLib.Variant]]] = {}
+    _pending_changes_source = 0
+    # Property writes held back by the write delay, in the order they were
+    # last made, as {(object path, interface, property): (object, type, value)}
+    _pending_writes: Dict[_PropertyKey, Tuple[GObject.GObject, str, object]] = {}
+    _pending_writes_source = 0
+    # Property writes collected by RatbagdDevice.transaction(), as
+    # {(object path, interface, property): (object, type, value, old value)}
+    # with the old value being the cached GLib.Variant to restore on failure.
+    _transaction: Optional[
+        Dict[
+            _PropertyKey,
+            Tuple[GObject.GObject, str, object, Optional[GLib.Variant]],
+        ]
+    ] = None
+    # The path of the device whose transaction() collects the writes above
+    _transaction_device: Optional[str] = None
+    _has_apply_batch = True
+    # DBusStats while enable_dbus_stats() is in effect
+    _stats: Optional[DBusStats] = None
+    # See add_signal_listener()
+    _signal_listeners: List[Callable] = []
 
     def __init__(self, interface, object_path):
         super().__init__()
 
-        if _RatbagdDBus._dbus is None:
+        # The settings of the Ratbagd this object belongs to, see there
+        creator = _RatbagdDBus._creator
+        self._asynchronous = creator._asynchronous if creator is not None else False
+        self._write_delay_ms = creator._write_delay_ms if creator is not None else 0
+
+        # Objects from a saved snapshot don't need ghostcatd, or the bus, to
+        # be around
+        self._stale = _RatbagdDBus._snapshot_is_saved
+        if _RatbagdDBus._dbus is None and not self._stale:
             try:
                 _RatbagdDBus._dbus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
             except GLib.Error as e:
@@ -156,30 +392,359 @@ class _RatbagdDBus(GObject.GObject):
         if os.environ.get("RATBAG_TEST"):
             ratbag1 = "org.freedesktop.ratbag_devel1"
 
+        # Our signals come through _on_bus_signal(). Only the manager needs
+        # to track the daemon's name owner, for any other object that would
+        # just be one more match rule on the bus.
+        flags = Gio.DBusProxyFlags.DO_NOT_CONNECT_SIGNALS
         if object_path is None:
             object_path = "/" + ratbag1.replace(".", "/")
+        else:
+            # Available since GLib 2.72
+            flags |= getattr(
+                Gio.DBusProxyFlags, "NO_MATCH_RULE", Gio.DBusProxyFlags.NONE
+            )
 
+        if not _RatbagdDBus._signal_subscription and not self._stale:
+            _RatbagdDBus._signal_subscription = _RatbagdDBus._dbus.signal_subscribe(
+                ratbag1,
+                None,
+                None,
+                None,
+                None,
+                Gio.DBusSignalFlags.NONE,
+                _RatbagdDBus._on_bus_signal,
+            )
+
+        self._bus_name = ratbag1
         self._object_path = object_path
         self._interface = f"{ratbag1}.{interface}"
 
+        properties = None
+        if _RatbagdDBus._snapshot is not None:
+            properties = _RatbagdDBus._snapshot.get(object_path, {}).get(
+                self._interface
+            )
+
+        if self._stale:
+            self._proxy = _SavedProxy(properties or {})
+        else:
+            self._proxy = self._new_proxy(interface, flags, properties)
+            if self._proxy.get_name_owner() is None:
+                raise RatbagdUnavailableError(f"No one currently owns {ratbag1}")
+
+        _RatbagdDBus._objects_by_path.setdefault(object_path, []).append(
+            weakref.ref(self)
+        )
+
+    def _new_proxy(self, interface, flags, properties):
+        stats = _RatbagdDBus._stats
+        if stats is not None:
+            start = time.perf_counter()
+        try:
+            if properties is not None:
+                # Everything we need is in the snapshot already. Binding to
+                # the unique name skips GetNameOwner() and we fill the
+                # property cache ourselves instead of calling GetAll().
+                proxy = Gio.DBusProxy.new_sync(
+                    _RatbagdDBus._dbus,
+                    flags | Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES,
+                    None,
+                    _RatbagdDBus._snapshot_owner or self._bus_name,
+                    self._object_path,
+                    self._interface,
+                    None,
+                )
+                for name, value in properties.items():
+                    proxy.set_cached_property(name, value)
+            else:
+                proxy = Gio.DBusProxy.new_sync(
+                    _RatbagdDBus._dbus,
+                    flags,
+                    None,
+                    self._bus_name,
+                    self._object_path,
+                    self._interface,
+                    None,
+                )
+        except GLib.Error as e:
+            if stats is not None:
+                stats.record(f"{interface} (proxy)", start, e)
+            raise RatbagdUnavailableError(e.message) from e
+        if stats is not None:
+            # Proxies filled from the snapshot don't touch the bus
+            kind = "snapshot proxy" if properties is not None else "proxy"
+            stats.record(f"{interface} ({kind})", start)
+        return proxy
+
+    @staticmethod
+    def _objects_for_path(object_path):
+        # The live objects representing the given object path.
+        refs = _RatbagdDBus._objects_by_path.get(object_path)
+        if refs is None:
+            return []
+        objects = [obj for obj in (ref() for ref in refs) if obj is not None]
+        if len(objects) != len(refs):
+            if objects:
+                refs[:] = [weakref.ref(obj) for obj in objects]
+            else:
+                del _RatbagdDBus._objects_by_path[object_path]
+        return objects
+
+    @staticmethod
+    def _is_device_object(object_path, device_path):
+        # The device is at ROOT/device/SYSNAME, its children at
+        # ROOT/KIND/SYSNAME/...
+        root, _, sysname = device_path.rsplit("/", 2)
+        parts = object_path[len(root) + 1 :].split("/")
+        return object_path.startswith(f"{root}/") and parts[1:2] == [sysname]
+
+    @staticmethod
+    def _forget_device_objects(device_path):
+        # Stops routing signals to the objects of a removed device, which
+        # may outlive it, and drops their entries.
+        for object_path in list(_RatbagdDBus._objects_by_path):
+            if _RatbagdDBus._is_device_object(object_path, device_path):
+                del _RatbagdDBus._objects_by_path[object_path]
+                _RatbagdDBus._pending_changes.pop(object_path, None)
+
+    @staticmethod
+    def _on_bus_signal(
+        connection,
+        sender_name,
+        object_path,
+        interface_name,
+        signal_name,
+        parameters,
+        *user_data,
+    ):
+        for listener in _RatbagdDBus._signal_listeners:
+            listener(object_path, interface_name, signal_name, parameters)
+
+        # Even for objects we haven't created yet
+        _RatbagdDBus._last_snapshot = None
+
+        if object_path not in _RatbagdDBus._objects_by_path:
+            return
+
+        if (
+            interface_name == "org.freedesktop.DBus.Properties"
+            and signal_name == "PropertiesChanged"
+        ):
+            interface = parameters.get_child_value(0).get_string()
+            changed = parameters.get_child_value(1)
+            pending = _RatbagdDBus._pending_changes.setdefault(
+                object_path, {}
+            ).setdefault(interface, {})
+            for i in range(changed.n_children()):
+                entry = changed.get_child_value(i)
+                name = entry.get_child_value(0).get_string()
+                pending[name] = entry.get_child_value(1).get_variant()
+            if not _RatbagdDBus._pending_changes_source:
+                _RatbagdDBus._pending_changes_source = GLib.idle_add(
+                    _RatbagdDBus._on_pending_changes_idle
+                )
+            return
+
+        # Keep the order in which ghostcatd sent things.
+        _RatbagdDBus._flush_pending_changes()
+        for obj in _RatbagdDBus._objects_for_path(object_path):
+            if obj._interface == interface_name:
+                start = time.perf_counter() if _RatbagdDBus._stats else None
+                obj._on_signal_received(
+                    obj._proxy, sender_name, signal_name, parameters
+                )
+                if start is not None and _RatbagdDBus._stats is not None:
+                    _RatbagdDBus._stats.record(
+                        obj._stats_name(signal=signal_name), start
+                    )
+
+    @staticmethod
+    def _on_pending_changes_idle():
+        _RatbagdDBus._pending_changes_source = 0
+        _RatbagdDBus._flush_pending_changes()
+        return False
+
+    @staticmethod
+    def _flush_pending_changes():
+        if _RatbagdDBus._pending_changes_source:
+            GLib.source_remove(_RatbagdDBus._pending_changes_source)
+            _RatbagdDBus._pending_changes_source = 0
+
+        pending = _RatbagdDBus._pending_changes
+        _RatbagdDBus._pending_changes = {}
+        for object_path, interfaces in pending.items():
+            for obj in _RatbagdDBus._objects_for_path(object_path):
+                changed = interfaces.get(obj._interface)
+                if changed:
+                    start = time.perf_counter() if _RatbagdDBus._stats else None
+                    obj._apply_properties_changed(changed)
+                    if start is not None and _RatbagdDBus._stats is not None:
+                        _RatbagdDBus._stats.record(
+                            obj._stats_name(signal="PropertiesChanged"), start
+                        )
+
+    def _apply_properties_changed(self, changed):
+        # Updates our proxy's cache, which it doesn't do itself as it is not
+        # connected to any signal, and lets the subclass react to it.
+        if _RatbagdDBus._pending_writes or _RatbagdDBus._transaction:
+            # Don't let ghostcatd's older values overwrite what we are
+            # about to write.
+            changed = {
+                name: value
+                for name, value in changed.items()
+                if (self._object_path, self._interface, name)
+                not in _RatbagdDBus._pending_writes
+                and (self._object_path, self._interface, name)
+                not in (_RatbagdDBus._transaction or {})
+            }
+        for name, value in changed.items():
+            self._proxy.set_cached_property(name, value)
+        changed_props = {name: value.unpack() for name, value in changed.items()}
+        self._on_properties_changed(self._proxy, changed_props, [])
+
+    def _get_managed_objects(self):
+        """Fetches the properties of every object exported by ghostcatd in
+        a single round trip.
+
+        Returns a dict of {object path: {interface: {property: value}}} with
+        the values left as GLib.Variant, ready for set_cached_property(), or
+        None if ghostcatd does not implement org.freedesktop.DBus.ObjectManager.
+        """
+        if not _RatbagdDBus._has_object_manager:
+            return None
+
+        stats = _RatbagdDBus._stats
+        if stats is not None:
+            start = time.perf_counter()
         try:
-            self._proxy = Gio.DBusProxy.new_sync(
-                _RatbagdDBus._dbus,
-                Gio.DBusProxyFlags.NONE,
+            res = _RatbagdDBus._dbus.call_sync(
+                self._proxy.get_name_owner(),
+                "/" + self._bus_name.replace(".", "/"),
+                "org.freedesktop.DBus.ObjectManager",
+                "GetManagedObjects",
                 None,
-                ratbag1,
-                object_path,
-                self._interface,
+                None,
+                Gio.DBusCallFlags.NO_AUTO_START,
+                2000,
                 None,
             )
         except GLib.Error as e:
-            raise RatbagdUnavailableError(e.message) from e
+            if stats is not None:
+                stats.record("ObjectManager.GetManagedObjects", start, e)
+            self._on_get_managed_objects_error(e)
+            return None
+        if stats is not None:
+            stats.record("ObjectManager.GetManagedObjects", start)
 
-        if self._proxy.get_name_owner() is None:
-            raise RatbagdUnavailableError(f"No one currently owns {ratbag1}")
+        return self._parse_managed_objects(res)
 
-        self._proxy.connect("g-properties-changed", self._on_properties_changed)
-        self._proxy.connect("g-signal", self._on_signal_received)
+    def _get_managed_objects_async(self, callback):
+        """Like _get_managed_objects() but returns immediately and invokes
+        callback(snapshot) from the main loop once the reply arrived."""
+        if not _RatbagdDBus._has_object_manager:
+
+            def on_idle():
+                callback(None)
+                return False
+
+            GLib.idle_add(on_idle)
+            return
+
+        start = time.perf_counter() if _RatbagdDBus._stats is not None else None
+
+        def on_reply(connection, result):
+            try:
+                res = connection.call_finish(result)
+            except GLib.Error as e:
+                if start is not None:
+                    _RatbagdDBus._stats.record(
+                        "ObjectManager.GetManagedObjects", start, e
+                    )
+                self._on_get_managed_objects_error(e)
+                callback(None)
+                return
+            if start is not None:
+                _RatbagdDBus._stats.record("ObjectManager.GetManagedObjects", start)
+            callback(self._parse_managed_objects(res))
+
+        _RatbagdDBus._dbus.call(
+            self._proxy.get_name_owner(),
+            "/" + self._bus_name.replace(".", "/"),
+            "org.freedesktop.DBus.ObjectManager",
+            "GetManagedObjects",
+            None,
+            None,
+            Gio.DBusCallFlags.NO_AUTO_START,
+            2000,
+            None,
+            on_reply,
+        )
+
+    @staticmethod
+    def _on_get_managed_objects_error(e):
+        # Older ghostcatd, every proxy loads its own properties.
+        if e.code in (
+            Gio.DBusError.UNKNOWN_METHOD,
+            Gio.DBusError.UNKNOWN_INTERFACE,
+        ):
+            _RatbagdDBus._has_object_manager = False
+
+    @staticmethod
+    def _parse_managed_objects(res):
+        # Walk the a{oa{sa{sv}}} by hand: unpack() would turn the values
+        # into Python objects and lose their D-Bus types.
+        snapshot = {}
+        objects = res.get_child_value(0)
+        for i in range(objects.n_children()):
+            entry = objects.get_child_value(i)
+            interfaces = {}
+            ifaces = entry.get_child_value(1)
+            for j in range(ifaces.n_children()):
+                iface = ifaces.get_child_value(j)
+                props = iface.get_child_value(1)
+                properties = {}
+                for k in range(props.n_children()):
+                    prop = props.get_child_value(k)
+                    name = prop.get_child_value(0).get_string()
+                    properties[name] = prop.get_child_value(1).get_variant()
+                interfaces[iface.get_child_value(0).get_string()] = properties
+            snapshot[entry.get_child_value(0).get_string()] = interfaces
+        return snapshot
+
+    def _new_children(self, cls, object_paths, snapshot=None):
+        """Creates a cls object for each of the given object paths. Unless we
+        are already within a snapshot, their properties and those of their
+        own children are loaded with a single GetManagedObjects() call. Its
+        reply is reused by later calls until ghostcatd sends a signal.
+
+        @param cls The _RatbagdDBus subclass to instantiate, or any callable
+                   taking an object path
+        @param object_paths The list of object paths
+        @param snapshot A GetManagedObjects() result fetched beforehand, see
+                        _get_managed_objects_async()
+        """
+        creator = _RatbagdDBus._creator
+        _RatbagdDBus._creator = self
+        try:
+            if _RatbagdDBus._snapshot is not None or not object_paths:
+                return [cls(objpath) for objpath in object_paths]
+
+            owner = self._proxy.get_name_owner()
+            if snapshot is None and _RatbagdDBus._last_snapshot_owner == owner:
+                snapshot = _RatbagdDBus._last_snapshot
+            if snapshot is None:
+                snapshot = self._get_managed_objects()
+            _RatbagdDBus._last_snapshot = snapshot
+            _RatbagdDBus._last_snapshot_owner = owner
+            _RatbagdDBus._snapshot = snapshot
+            _RatbagdDBus._snapshot_owner = owner
+            try:
+                return [cls(objpath) for objpath in object_paths]
+            finally:
+                _RatbagdDBus._snapshot = None
+                _RatbagdDBus._snapshot_owner = None
+        finally:
+            _RatbagdDBus._creator = creator
 
     def _on_properties_changed(self, proxy, changed_props, invalidated_props):
         # Implement this in derived classes to respond to property changes.
@@ -212,14 +777,34 @@ class _RatbagdDBus(GObject.GObject):
 
     def _set_dbus_property(self, property, type, value, readwrite=True):
         # Sets a cached property on the bus.
+        if readwrite and _RatbagdDBus._transaction is not None:
+            self._collect_dbus_property(property, type, value)
+            return
+        if readwrite and self._write_delay_ms > 0:
+            self._queue_dbus_property(property, type, value)
+            return
+        if readwrite and self._asynchronous:
+            self._set_dbus_property_async(property, type, value)
+            return
+
+        val = GLib.Variant(f"{type}", value)
+        if readwrite:
+            self._send_dbus_property(property, val)
 
+        # This is our local copy, so we don't have to wait for the async
+        # update
+        self._proxy.set_cached_property(property, val)
+
+    def _send_dbus_property(self, property, val):
         # Take our real value and wrap it into a variant. To call
         # org.freedesktop.DBus.Properties.Set we need to wrap that again
         # into a (ssv), where v is our value's variant.
         # args to .Set are "interface name", "function name",  value-variant
-        val = GLib.Variant(f"{type}", value)
-        if readwrite:
-            pval = GLib.Variant("(ssv)", (self._interface, property, val))
+        pval = GLib.Variant("(ssv)", (self._interface, property, val))
+        stats = _RatbagdDBus._stats
+        if stats is not None:
+            start = time.perf_counter()
+        try:
             self._proxy.call_sync(
                 "org.freedesktop.DBus.Properties.Set",
                 pval,
@@ -227,10 +812,117 @@ class _RatbagdDBus(GObject.GObject):
                 2000,
                 None,
             )
+        except GLib.Error as e:
+            if stats is not None:
+                stats.record(self._stats_name(property=property), start, e)
+            raise
+        if stats is not None:
+            stats.record(self._stats_name(property=property), start)
+
+    def _queue_dbus_property(self, property, type, value):
+        # Updates our local copy and the getters right away but holds the
+        # write back until no property was set for _write_delay_ms, or until
+        # the next method call or flush(). Only the last value per property
+        # is sent.
+        key = (self._object_path, self._interface, property)
+        _RatbagdDBus._pending_writes.pop(key, None)
+        _RatbagdDBus._pending_writes[key] = (self, type, value)
+        val = GLib.Variant(f"{type}", value)
+        self._proxy.set_cached_property(property, val)
+        self._on_properties_changed(self._proxy, {property: val.unpack()}, [])
 
-        # This is our local copy, so we don't have to wait for the async
-        # update
+        if _RatbagdDBus._pending_writes_source:
+            GLib.source_remove(_RatbagdDBus._pending_writes_source)
+        _RatbagdDBus._pending_writes_source = GLib.timeout_add(
+            self._write_delay_ms, _RatbagdDBus._on_write_delay_expired
+        )
+
+    def _collect_dbus_property(self, property, type, value):
+        # Updates our local copy and the getters right away, the write is
+        # sent with the rest of the transaction, see
+        # RatbagdDevice.transaction().
+        device_path = _RatbagdDBus._transaction_device
+        if not self._is_device_object(self._object_path, device_path):
+            # ghostcatd would reject the whole batch
+            raise ValueError(
+                f"{self._object_path} cannot be changed in a transaction of "
+                f"{device_path}"
+            )
+        key = (self._object_path, self._interface, property)
+        previous = _RatbagdDBus._transaction.pop(key, None)
+        if previous is not None:
+            old = previous[3]
+        else:
+            old = self._proxy.get_cached_property(property)
+        _RatbagdDBus._transaction[key] = (self, type, value, old)
+        val = GLib.Variant(f"{type}", value)
         self._proxy.set_cached_property(property, val)
+        self._on_properties_changed(self._proxy, {property: val.unpack()}, [])
+
+    @staticmethod
+    def _discard_transaction(changes):
+        # Restores the values our local copies and the getters had before
+        # the transaction.
+        for (_path, _interface, name), (obj, _type, _value, old) in changes.items():
+            obj._proxy.set_cached_property(name, old)
+            if old is not None:
+                obj._on_properties_changed(obj._proxy, {name: old.unpack()}, [])
+
+    @staticmethod
+    def _on_write_delay_expired():
+        _RatbagdDBus._pending_writes_source = 0
+        try:
+            _RatbagdDBus._flush_pending_writes()
+        except (GLib.Error, RatbagError, RatbagdDBusTimeoutError) as e:
+            print(e, file=sys.stderr)
+        return False
+
+    @staticmethod
+    def _flush_pending_writes():
+        if _RatbagdDBus._pending_writes_source:
+            GLib.source_remove(_RatbagdDBus._pending_writes_source)
+            _RatbagdDBus._pending_writes_source = 0
+
+        pending = _RatbagdDBus._pending_writes
+        _RatbagdDBus._pending_writes = {}
+        error = None
+        for (_path, _interface, name), (obj, signature, value) in pending.items():
+            if obj._asynchronous:
+                obj._set_dbus_property_async(name, signature, value)
+                continue
+            try:
+                obj._send_dbus_property(name, GLib.Variant(signature, value))
+            except (GLib.Error, RatbagError, RatbagdDBusTimeoutError) as e:
+                # Keep going, the other properties are unrelated.
+                error = error or e
+        if error is not None:
+            raise error
+
+    def flush(self):
+        """Sends all property changes still held back by the write delay to
+        ghostcatd, for all objects. This happens automatically before any
+        method call, e.g. RatbagdDevice.commit(), but must be done before
+        exiting."""
+        _RatbagdDBus._flush_pending_writes()
+        if self._asynchronous:
+            # Don't return before the writes have left the process
+            _RatbagdDBus._dbus.flush_sync(None)
+
+    def _set_dbus_property_async(self, property, type, value, callback=None):
+        # Sets a property on the bus without waiting for the reply, see
+        # _dbus_call_async() for the callback and the return value. The
+        # cached value is updated immediately.
+        val = GLib.Variant(f"{type}", value)
+        future = self._dbus_call_async(
+            "org.freedesktop.DBus.Properties.Set",
+            "ssv",
+            self._interface,
+            property,
+            val,
+            callback=callback,
+        )
+        self._proxy.set_cached_property(property, val)
+        return future
 
     def _dbus_call(self, method, type, *value):
         # Calls a method synchronously on the bus, using the given method name,
@@ -240,21 +932,136 @@ class _RatbagdDBus(GObject.GObject):
         # appropriate RatbagError* or RatbagdDBus* exception, or GLib.Error if
         # it is an unexpected exception that probably shouldn't be passed up to
         # the UI.
+        if _RatbagdDBus._pending_writes:
+            _RatbagdDBus._flush_pending_writes()
+
         val = GLib.Variant(f"({type})", value)
+        stats = _RatbagdDBus._stats
+        if stats is not None:
+            start = time.perf_counter()
         try:
             res = self._proxy.call_sync(
                 method, val, Gio.DBusCallFlags.NO_AUTO_START, 2000, None
             )
-            if res in EXCEPTION_TABLE:
-                raise EXCEPTION_TABLE[res]
-            return res.unpack()[0]  # Result is always a tuple
         except GLib.Error as e:
-            if e.code == Gio.IOErrorEnum.TIMED_OUT:
-                raise RatbagdDBusTimeoutError(e.message) from e
+            error = self._convert_dbus_error(e)
+            if stats is not None:
+                stats.record(self._stats_name(method), start, error)
+            if error is e:
+                raise
+            raise error from e
+        if stats is not None:
+            stats.record(self._stats_name(method), start)
+        return self._unpack_dbus_result(res)
+
+    def _dbus_call_async(self, method, type, *value, callback=None):
+        # Calls a method asynchronously on the bus, using the given method
+        # name, type signature and values. Returns immediately.
+        #
+        # Once the reply arrives, callback(result, error) is invoked from the
+        # main loop, with error being None on success or the exception
+        # _dbus_call() would have raised. When called from a running asyncio
+        # event loop (e.g. with GLib's asyncio integration), an
+        # asyncio.Future resolving to the same result is returned as well,
+        # otherwise None.
+        if _RatbagdDBus._pending_writes:
+            _RatbagdDBus._flush_pending_writes()
+
+        future = None
+        try:
+            future = asyncio.get_running_loop().create_future()
+        except RuntimeError:
+            pass
 
-            # Unrecognized error code.
-            print(e.message, file=sys.stderr)
-            raise
+        stats_name = start = None
+        if _RatbagdDBus._stats is not None:
+            if method == "org.freedesktop.DBus.Properties.Set":
+                stats_name = self._stats_name(property=value[1])
+            else:
+                stats_name = self._stats_name(method)
+            start = time.perf_counter()
+
+        val = GLib.Variant(f"({type})", value)
+        self._proxy.call(
+            method,
+            val,
+            Gio.DBusCallFlags.NO_AUTO_START,
+            2000,
+            None,
+            self._on_dbus_call_finished,
+            (callback, future, stats_name, start),
+        )
+        return future
+
+    def _method_async(self, method, property, callback):
+        # Calls one of the argument-less Set* methods asynchronously and sets
+        # the given boolean property in our local copy once it succeeded.
+        def on_finished(ret, error):
+            if error is None:
+                self._set_dbus_property(property, "b", True, readwrite=False)
+            if callback is not None:
+                callback(ret, error)
+            elif error is not None:
+                print(error, file=sys.stderr)
+
+        return self._dbus_call_async(method, "", callback=on_finished)
+
+    def _on_dbus_call_finished(self, proxy, result, user_data):
+        callback, future, stats_name, start = user_data
+        ret, error = None, None
+        try:
+            res = proxy.call_finish(result)
+        except GLib.Error as e:
+            error = self._convert_dbus_error(e)
+        else:
+            try:
+                ret = self._unpack_dbus_result(res)
+            except RatbagError as e:
+                error = e
+        if stats_name is not None and _RatbagdDBus._stats is not None:
+            # Only transport errors count, like in _dbus_call()
+            _RatbagdDBus._stats.record(
+                stats_name, start, None if isinstance(error, RatbagError) else error
+            )
+
+        try:
+            if callback is not None:
+                callback(ret, error)
+        finally:
+            # Resolved even if the callback raised, so nobody awaits forever
+            if future is not None and not future.cancelled():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(ret)
+            elif callback is None and error is not None:
+                # Nobody is waiting for this reply, make sure the failure is
+                # not silently lost.
+                print(error, file=sys.stderr)
+
+    def _stats_name(self, method=None, property=None, signal=None):
+        # How a call shows up in DBusStats, e.g. "Device.Commit",
+        # "Resolution.Resolution (set)" or "Device.Resync (signal)"
+        interface = self._interface.rsplit(".", 1)[-1]
+        if property is not None:
+            return f"{interface}.{property} (set)"
+        if signal is not None:
+            return f"{interface}.{signal} (signal)"
+        return f"{interface}.{method}"
+
+    def _unpack_dbus_result(self, res):
+        if res in EXCEPTION_TABLE:
+            raise EXCEPTION_TABLE[res]
+        # Result is always a tuple, empty for e.g. Properties.Set
+        return res.unpack()[0] if res.n_children() else None
+
+    def _convert_dbus_error(self, e):
+        if e.code == Gio.IOErrorEnum.TIMED_OUT:
+            return RatbagdDBusTimeoutError(e.message)
+
+        # Unrecognized error code.
+        print(e.message, file=sys.stderr)
+        return e
 
     def __eq__(self, other):
         return other and self._object_path == other._object_path
@@ -266,6 +1073,22 @@ class Ratbagd(_RatbagdDBus):
     RatbagdDevice, RatbagdProfile, RatbagdResolution and RatbagdButton objects.
 
     Throws RatbagdUnavailableError when the DBus service is not available.
+
+    With asynchronous set to True, property setters on the objects of this
+    Ratbagd return without waiting for ghostcatd's reply. Methods provide
+    *_async() variants regardless of this setting, see
+    _RatbagdDBus._dbus_call_async().
+
+    With write_delay_ms set, property setters only update the local copy and
+    the last value of each property is written once no property was set for
+    that many milliseconds, before any method call (e.g. commit()), or on
+    flush(). This collapses e.g. a slider drag into a single write.
+
+    Devices plugged in at runtime are fetched in the background for
+    asynchronous clients and device-added is emitted once they are ready.
+    Like for all clients, the resolutions, buttons and LEDs of a profile are
+    created on first access, from that fetch unless ghostcatd sent a signal
+    since, see RatbagdDevice.load_children().
     """
 
     __gsignals__ = {
@@ -278,8 +1101,11 @@ class Ratbagd(_RatbagdDBus):
         "daemon-disappeared": (GObject.SignalFlags.RUN_FIRST, None, ()),
     }
 
-    def __init__(self, api_version):
+    def __init__(self, api_version, asynchronous=False, write_delay_ms=0):
         super().__init__("Manager", None)
+        # Taken over by the devices and their children
+        self._asynchronous = asynchronous
+        self._write_delay_ms = write_delay_ms
         result = self._get_dbus_property("Devices")
         if result is None and not self._proxy.get_cached_property_names():
             raise RatbagdUnavailableError(
@@ -287,7 +1113,14 @@ class Ratbagd(_RatbagdDBus):
             )
         if self.api_version != api_version:
             raise RatbagdIncompatibleError(self.api_version or -1, api_version)
-        self._devices = [RatbagdDevice(objpath) for objpath in result or []]
+
+        self._devices = self._new_children(RatbagdDevice, result or [])
+        self._devices_by_path = {d._object_path: d for d in self._devices}
+        # The latest Devices list and whether a background fetch of the new
+        # ones is in flight, or has to be started again once it returns.
+        self._device_paths = list(self._devices_by_path)
+        self._hydrating = False
+        self._hydrate_again = False
         self._proxy.connect("notify::g-name-owner", self._on_name_owner_changed)
 
     def _on_name_owner_changed(self, *kwargs):
@@ -300,18 +1133,71 @@ class Ratbagd(_RatbagdDBus):
             # Different property changed, skip.
             pass
         else:
-            object_paths = [d._object_path for d in self._devices]
-            for object_path in new_device_object_paths:
-                if object_path not in object_paths:
-                    device = RatbagdDevice(object_path)
-                    self._devices.append(device)
-                    self.emit("device-added", device)
-            for device in self.devices:
-                if device._object_path not in new_device_object_paths:
-                    self._devices.remove(device)
-                    self.emit("device-removed", device)
+            self._update_devices(new_device_object_paths)
+
+    def _update_devices(self, object_paths):
+        self._device_paths = object_paths
+        wanted = set(object_paths)
+
+        removed = [d for d in self._devices if d._object_path not in wanted]
+        if removed:
+            self._devices = [d for d in self._devices if d._object_path in wanted]
+            for device in removed:
+                del self._devices_by_path[device._object_path]
+                _RatbagdDBus._forget_device_objects(device._object_path)
+                self.emit("device-removed", device)
+
+        added = [p for p in object_paths if p not in self._devices_by_path]
+        if added and self._asynchronous:
+            self._hydrate_devices()
+        elif added:
+            self._add_devices(self._new_children(RatbagdDevice, added))
+        elif removed:
             self.notify("devices")
 
+    def _hydrate_devices(self):
+        # Fetches all new devices in one GetManagedObjects() call without
+        # blocking. A hot-plug storm results in at most one call in flight
+        # and one more for everything that changed meanwhile.
+        if self._hydrating:
+            self._hydrate_again = True
+            return
+        self._hydrating = True
+        self._hydrate_again = False
+        self._get_managed_objects_async(self._on_devices_snapshot)
+
+    def _on_devices_snapshot(self, snapshot):
+        self._hydrating = False
+        added = [p for p in self._device_paths if p not in self._devices_by_path]
+        if snapshot is not None:
+            # Anything not in there yet is in a Devices change we have not
+            # seen at the time of the call, _hydrate_again takes care of it.
+            added = [p for p in added if p in snapshot]
+        try:
+            # Without a snapshot, i.e. for an older ghostcatd, this falls
+            # back to creating the devices synchronously.
+            devices = self._new_children(RatbagdDevice, added, snapshot)
+        except RatbagdUnavailableError as e:
+            # Most likely unplugged again already
+            print(e, file=sys.stderr)
+            devices = []
+        self._add_devices(devices)
+
+        if self._hydrate_again:
+            self._hydrate_devices()
+
+    def _add_devices(self, devices):
+        wanted = set(self._device_paths)
+        devices = [d for d in devices if d._object_path in wanted]
+        if not devices:
+            return
+        for device in devices:
+            self._devices.append(device)
+            self._devices_by_path[device._object_path] = device
+        for device in devices:
+            self.emit("device-added", device)
+        self.notify("devices")
+
     @GObject.Property
     def api_version(self):
         return self._get_dbus_property("APIVersion")
@@ -353,7 +1239,7 @@ class RatbagdDevice(_RatbagdDBus):
         # FIXME: if we start adding and removing objects from this list,
         # things will break!
         result = self._get_dbus_property("Profiles") or []
-        self._profiles = [RatbagdProfile(objpath) for objpath in result]
+        self._profiles = self._new_children(RatbagdProfile, result)
         for profile in self._profiles:
             profile.connect("notify::is-active", self._on_active_profile_changed)
 
@@ -368,6 +1254,79 @@ class RatbagdDevice(_RatbagdDBus):
         if profile.is_active:
             self.emit("active-profile-changed", self._profiles[profile.index])
 
+    def load_children(self):
+        """Creates the resolutions, buttons and leds of all profiles now
+        rather than on their first access, see RatbagdProfile.load_children().
+        """
+        for profile in self._profiles:
+            profile.load_children()
+
+    @classmethod
+    def new_from_snapshot(cls, snapshot):
+        """Creates a device with all its profiles, resolutions, buttons and
+        LEDs from a snapshot returned by get_snapshot() earlier, without
+        talking to ghostcatd. The result is marked stale and is meant for
+        display only, e.g. until ghostcatd is ready. It is not tracked by
+        any Ratbagd and changing it has undefined results.
+
+        @param snapshot The GLib.Variant returned by get_snapshot()
+        @raises ValueError if the snapshot does not contain a device
+        """
+        objects = cls._parse_managed_objects(snapshot)
+        object_path = next(
+            (
+                path
+                for path, interfaces in objects.items()
+                if any(i.endswith(".Device") for i in interfaces)
+            ),
+            None,
+        )
+        if object_path is None:
+            raise ValueError("Snapshot does not contain a device")
+
+        _RatbagdDBus._snapshot = objects
+        _RatbagdDBus._snapshot_owner = None
+        _RatbagdDBus._snapshot_is_saved = True
+        try:
+            device = cls(object_path)
+            # Resolutions, buttons and LEDs have to come from the snapshot
+            # as well, create them now.
+            device.load_children()
+        finally:
+            _RatbagdDBus._snapshot = None
+            _RatbagdDBus._snapshot_is_saved = False
+        return device
+
+    def get_snapshot(self):
+        """Returns the current state of this device and of all its profiles,
+        resolutions, buttons and LEDs as a GLib.Variant of the same type as
+        a GetManagedObjects() reply, (a{oa{sa{sv}}}). Use
+        GLib.Variant.get_data_as_bytes() to store it and
+        new_from_snapshot() to turn it back into a device.
+        """
+        objects = [self]
+        for profile in self.profiles:
+            objects.append(profile)
+            objects.extend(profile.resolutions)
+            objects.extend(profile.buttons)
+            objects.extend(profile.leds)
+
+        snapshot = {}
+        for obj in objects:
+            proxy = obj._proxy
+            properties = {
+                name: proxy.get_cached_property(name)
+                for name in proxy.get_cached_property_names()
+            }
+            snapshot[obj._object_path] = {obj._interface: properties}
+        return GLib.Variant("(a{oa{sa{sv}}})", (snapshot,))
+
+    @GObject.Property
+    def stale(self):
+        """True if this device was created by new_from_snapshot() and does
+        not reflect ghostcatd's current state."""
+        return self._stale
+
     @GObject.Property
     def id(self):
         return self._id
@@ -426,6 +1385,112 @@ class RatbagdDevice(_RatbagdDBus):
         """
         self._dbus_call("Commit", "")
 
+    def commit_async(self, callback=None):
+        """Commits all changes made to the device without blocking on
+        ghostcatd's reply. Calls queued before this one, e.g. property
+        changes, are processed by ghostcatd first.
+
+        @param callback Optional callable(result, error), see
+                        _RatbagdDBus._dbus_call_async()
+        """
+        return self._dbus_call_async("Commit", "", callback=callback)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Collects the property changes made within the with block and sends
+        them to ghostcatd in a single ApplyBatch() call when the block exits,
+        instead of one call per property. ghostcatd checks the objects,
+        properties and value types of the whole batch first: if one of them
+        is invalid, none is applied and our local copies are restored. The
+        values themselves are applied one by one, a value the device does
+        not support is dropped like it is for a single property.
+
+        Only properties of this device's profiles, resolutions, buttons and
+        LEDs may be changed within the block, changing another device's
+        raises ValueError. Method calls, e.g. commit(), are still made
+        immediately, i.e. before the collected changes. If the block raises
+        an exception, the changes are discarded.
+
+            with device.transaction():
+                profile.report_rate = 1000
+                resolution.resolution = (800, 800)
+            device.commit()
+        """
+        if _RatbagdDBus._transaction is not None:
+            if _RatbagdDBus._transaction_device != self._object_path:
+                raise ValueError(
+                    f"{self._object_path} cannot start a transaction within "
+                    f"one of {_RatbagdDBus._transaction_device}"
+                )
+            # Nested, the outermost transaction sends everything.
+            yield self
+            return
+
+        _RatbagdDBus._transaction = {}
+        _RatbagdDBus._transaction_device = self._object_path
+        try:
+            yield self
+        except BaseException:
+            self._discard_transaction(_RatbagdDBus._transaction)
+            raise
+        finally:
+            changes = _RatbagdDBus._transaction
+            _RatbagdDBus._transaction = None
+            _RatbagdDBus._transaction_device = None
+
+        self._apply_batch(changes)
+
+    def _apply_batch(self, changes):
+        if not changes:
+            return
+        if not _RatbagdDBus._has_apply_batch:
+            self._replay_batch(changes)
+            return
+
+        batch: Dict[str, Dict[str, GLib.Variant]] = {}
+        for (path, _interface, name), (_obj, signature, value, _old) in changes.items():
+            batch.setdefault(path, {})[name] = GLib.Variant(signature, value)
+
+        if self._asynchronous:
+
+            def on_finished(ret, error):
+                if error is None:
+                    return
+                if self._is_unknown_method(error):
+                    _RatbagdDBus._has_apply_batch = False
+                    self._replay_batch(changes)
+                    return
+                self._discard_transaction(changes)
+                print(error, file=sys.stderr)
+
+            self._dbus_call_async(
+                "ApplyBatch", "a{oa{sv}}", batch, callback=on_finished
+            )
+            return
+
+        try:
+            self._dbus_call("ApplyBatch", "a{oa{sv}}", batch)
+        except GLib.Error as e:
+            if not self._is_unknown_method(e):
+                self._discard_transaction(changes)
+                raise
+            # Older ghostcatd, fall back to one call per property.
+            _RatbagdDBus._has_apply_batch = False
+            self._replay_batch(changes)
+        except (RatbagError, RatbagdDBusTimeoutError):
+            self._discard_transaction(changes)
+            raise
+
+    @staticmethod
+    def _is_unknown_method(error):
+        unknown_method = Gio.DBusError.UNKNOWN_METHOD
+        return isinstance(error, GLib.Error) and error.code == unknown_method
+
+    @staticmethod
+    def _replay_batch(changes):
+        for (_path, _interface, name), (obj, signature, value, _old) in changes.items():
+            obj._set_dbus_property(name, signature, value)
+
 
 class RatbagdProfile(_RatbagdDBus):
     """Represents a ghostcatd profile."""
@@ -444,19 +1509,18 @@ class RatbagdProfile(_RatbagdDBus):
         self._disabled = self._get_dbus_property("Disabled")
         self._report_rate = self._get_dbus_property("ReportRate")
 
+        # The resolutions, buttons and leds are only created on first
+        # access, most callers only ever look at a few of them.
+        self._resolutions: Optional[List[RatbagdResolution]] = None
+        self._buttons: Optional[List[RatbagdButton]] = None
+        self._leds: Optional[List[RatbagdLed]] = None
+
+    def _new_dirty_children(self, cls, property):
         # FIXME: if we start adding and removing objects from any of these
         # lists, things will break!
-        result = self._get_dbus_property("Resolutions") or []
-        self._resolutions = [RatbagdResolution(objpath) for objpath in result]
-        self._subscribe_dirty(self._resolutions)
-
-        result = self._get_dbus_property("Buttons") or []
-        self._buttons = [RatbagdButton(objpath) for objpath in result]
-        self._subscribe_dirty(self._buttons)
-
-        result = self._get_dbus_property("Leds") or []
-        self._leds = [RatbagdLed(objpath) for objpath in result]
-        self._subscribe_dirty(self._leds)
+        objects = self._new_children(cls, self._get_dbus_property(property) or [])
+        self._subscribe_dirty(objects)
+        return objects
 
     def _subscribe_dirty(self, objects: List[GObject.GObject]):
         for obj in objects:
@@ -626,6 +1690,10 @@ class RatbagdProfile(_RatbagdDBus):
         """A list of RatbagdResolution objects with this profile's resolutions.
         Note that the list of resolutions differs between profiles but the number
         of resolutions is identical across profiles."""
+        if self._resolutions is None:
+            self._resolutions = self._new_dirty_children(
+                RatbagdResolution, "Resolutions"
+            )
         return self._resolutions
 
     @GObject.Property
@@ -634,7 +1702,7 @@ class RatbagdProfile(_RatbagdDBus):
         property computed over the cached list of resolutions. In the unlikely
         case that your device driver is misconfigured and there is no active
         resolution, this returns `None`."""
-        for resolution in self._resolutions:
+        for resolution in self.resolutions:
             if resolution.is_active:
                 return resolution
         print(
@@ -648,6 +1716,8 @@ class RatbagdProfile(_RatbagdDBus):
         """A list of RatbagdButton objects with this profile's button mappings.
         Note that the list of buttons differs between profiles but the number
         of buttons is identical across profiles."""
+        if self._buttons is None:
+            self._buttons = self._new_dirty_children(RatbagdButton, "Buttons")
         return self._buttons
 
     @GObject.Property
@@ -655,8 +1725,16 @@ class RatbagdProfile(_RatbagdDBus):
         """A list of RatbagdLed objects with this profile's leds. Note that the
         list of leds differs between profiles but the number of leds is
         identical across profiles."""
+        if self._leds is None:
+            self._leds = self._new_dirty_children(RatbagdLed, "Leds")
         return self._leds
 
+    def load_children(self):
+        """Creates the resolutions, buttons and leds now rather than on
+        their first access."""
+        for name in ("resolutions", "buttons", "leds"):
+            getattr(self, name)
+
     @GObject.Property
     def is_active(self):
         """Returns True if the profile is currently active, false otherwise."""
@@ -668,6 +1746,15 @@ class RatbagdProfile(_RatbagdDBus):
         self._set_dbus_property("IsActive", "b", True, readwrite=False)
         return ret
 
+    def set_active_async(self, callback=None):
+        """Set this profile to be the active profile without blocking on
+        ghostcatd's reply.
+
+        @param callback Optional callable(result, error), see
+                        _RatbagdDBus._dbus_call_async()
+        """
+        return self._method_async("SetActive", "IsActive", callback)
+
 
 class RatbagdResolution(_RatbagdDBus):
     """Represents a ghostcatd resolution."""
@@ -833,6 +1920,38 @@ class RatbagdResolution(_RatbagdDBus):
         self._set_dbus_property("IsDpiShiftTarget", "b", True, readwrite=False)
         return ret
 
+    def set_active_async(self, callback=None):
+        """Asynchronous variant of set_active().
+
+        @param callback Optional callable(result, error), see
+                        _RatbagdDBus._dbus_call_async()
+        """
+        return self._method_async("SetActive", "IsActive", callback)
+
+    def set_default_async(self, callback=None):
+        """Asynchronous variant of set_default().
+
+        @param callback Optional callable(result, error), see
+                        _RatbagdDBus._dbus_call_async()
+        """
+        return self._method_async("SetDefault", "IsDefault", callback)
+
+    def set_disabled_async(self, disable, callback=None):
+        """Asynchronous variant of set_disabled().
+
+        @param callback Optional callable(result, error), see
+                        _RatbagdDBus._dbus_call_async()
+        """
+        return self._set_dbus_property_async("IsDisabled", "b", disable, callback)
+
+    def set_dpi_shift_target_async(self, callback=None):
+        """Asynchronous variant of set_dpi_shift_target().
+
+        @param callback Optional callable(result, error), see
+                        _RatbagdDBus._dbus_call_async()
+        """
+        return self._method_async("SetDpiShiftTarget", "IsDpiShiftTarget", callback)
+
 
 class RatbagdButton(_RatbagdDBus):
     """Represents a ghostcatd button."""
@@ -1254,3 +2373,7 @@ class RatbagdLed(_RatbagdDBus):
             if mode != self._mode:
                 self._mode = mode
                 self.notify("mode")
+
+
+if os.environ.get("RATBAG_DBUS_STATS"):
+    enable_dbus_stats(dump_at_exit=True)
@@ -1,13 +1,13 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
-from typing import Any, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import cairo
 import gi
 import sys
-from lxml import etree
 
-from ghostcat.svg import get_svg
+from ghostcat import profiler
+from ghostcat.svg import get_svg_asset
 from .ghostcatd import RatbagdDevice
 
 gi.require_version("Gdk", "3.0")
@@ -108,12 +108,11 @@ class MouseMap(Gtk.Container):
         if ghostcatd_device is None:
             raise ValueError("Device cannot be None")
         try:
-            svg_bytes = get_svg(ghostcatd_device.model)
-            assert svg_bytes is not None
-            handle = Rsvg.Handle.new_from_data(svg_bytes)
-            assert handle is not None
-            self._handle: Rsvg.Handle = handle
-            self._svg_data = etree.fromstring(svg_bytes)
+            # Shared with every other MouseMap showing the same SVG
+            asset = get_svg_asset(ghostcatd_device.model)
+            self._handle: Rsvg.Handle = asset.handle
+            # The geometry and leader styles extracted at build time
+            self._svg_elements = asset.elements
         except FileNotFoundError as e:
             raise ValueError("Device has no image or its path is invalid") from e
 
@@ -125,6 +124,18 @@ class MouseMap(Gtk.Container):
         self._device = ghostcatd_device
         self._children: List[_MouseMapChild] = []
         self._highlight_element: Optional[str] = None
+        # Every query to librsvg walks and measures the SVG tree again, so the
+        # geometry of the elements we lay out against is looked up only once
+        # per SVG.
+        self._geometry: Dict[str, Optional[Gdk.Rectangle]] = asset.geometry
+        if not self._geometry:
+            self._build_geometry_index()
+        # The device and its leaders are rendered once into image surfaces
+        # that are blitted on every draw. They depend on the scale factor and
+        # the highlight colour, whenever those change the layers are dropped.
+        self._layers: Dict[str, cairo.ImageSurface] = {}
+        self._layers_key: Optional[Tuple[int, Tuple[float, float, float]]] = None
+        self.connect("notify::scale-factor", self._on_scale_factor_changed)
 
         # TODO: remove this when we're out of the transition to toned down SVGs
         device = self._handle.has_sub("#Device")
@@ -151,12 +162,14 @@ class MouseMap(Gtk.Container):
         ):
             return
 
-        is_left = self._xpath_has_style(svg_leader[1:], "text-align:end")
+        leader = self._svg_elements.get(svg_leader[1:], {})
+        is_left = leader.get("text-align") == "end"
         child = _MouseMapChild(widget, is_left, svg_id)
         self._children.append(child)
         widget.connect("enter-notify-event", self._on_enter, child)
         widget.connect("leave-notify-event", self._on_leave)
         widget.set_parent(self)
+        self._layers.pop("leaders", None)
 
     def do_remove(self, widget: Gtk.Widget) -> None:
         """Removes the given widget from the map.
@@ -168,6 +181,7 @@ class MouseMap(Gtk.Container):
                 if child.widget == widget:
                     self._children.remove(child)
                     child.widget.unparent()
+                    self._layers.pop("leaders", None)
                     break
 
     def do_forall(
@@ -305,17 +319,24 @@ class MouseMap(Gtk.Container):
 
         @param cr The Cairo context to draw into, as cairo.Context
         """
-        scale_factor = self.get_scale_factor()
-        target = cr.get_target()
-        target.set_device_scale(scale_factor, scale_factor)
+        with profiler.span("MouseMap.do_draw", "draw"):
+            scale_factor = self.get_scale_factor()
+            target = cr.get_target()
+            target.set_device_scale(scale_factor, scale_factor)
+
+            cr.save()
+            x, y = self._translate_to_origin()
+            cr.translate(x, y)
+            self._draw_device(cr)
+            cr.restore()
+            for child in self._children:
+                self.propagate_draw(child.widget, cr)
 
-        cr.save()
-        x, y = self._translate_to_origin()
-        cr.translate(x, y)
-        self._draw_device(cr)
-        cr.restore()
-        for child in self._children:
-            self.propagate_draw(child.widget, cr)
+    def do_style_updated(self) -> None:
+        """Drops the rendered layers when the theme changes, as the highlight
+        colour may have changed with it."""
+        Gtk.Container.do_style_updated(self)
+        self._invalidate_layers()
 
     def do_get_property(self, prop: GObject.ParamSpec) -> Any:
         """Gets a property value.
@@ -344,24 +365,42 @@ class MouseMap(Gtk.Container):
         self._highlight_element = None
         self._redraw_svg_element(old_highlight)
 
-    def _xpath_has_style(self, svg_id: str, style: str) -> bool:
-        # Checks if the SVG element with the given identifier has the given
-        # style attribute set.
-        namespaces = {
-            "sodipodi": "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
-            "cc": "http://web.resource.org/cc/",
-            "svg": "http://www.w3.org/2000/svg",
-            "dc": "http://purl.org/dc/elements/1.1/",
-            "xlink": "http://www.w3.org/1999/xlink",
-            "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
-            "inkscape": "http://www.inkscape.org/namespaces/inkscape",
-        }
-        query = f'//svg:rect[@id="{svg_id}"][contains(@style, "{style}")]'
-        element = self._svg_data.xpath(query, namespaces=namespaces)
-        return element is not None and len(element) == 1 and element[0] is not None
+    def _on_scale_factor_changed(
+        self, widget: Gtk.Widget, pspec: GObject.ParamSpec
+    ) -> None:
+        # The layers were rendered for the old scale factor.
+        self._invalidate_layers()
+
+    def _invalidate_layers(self) -> None:
+        self._layers.clear()
+        self._layers_key = None
+        self.queue_draw()
+
+    def _build_geometry_index(self) -> None:
+        # Fills the index with the geometry of every button and LED element,
+        # leader and path in the SVG, as extracted at build time. Anything
+        # else is looked up from librsvg when first needed.
+        for svg_id, element in self._svg_elements.items():
+            geometry = Gdk.Rectangle()
+            geometry.x = element["x"]
+            geometry.y = element["y"]
+            geometry.width = element["width"]
+            geometry.height = element["height"]
+            self._geometry[f"#{svg_id}"] = geometry
 
     def _get_svg_sub_geometry(self, svg_id: str) -> Tuple[bool, Gdk.Rectangle]:
         # Helper method to get an SVG element's x- and y-coordinates, width and
+        # height, from the geometry index where possible.
+        if svg_id not in self._geometry:
+            ok, ret = self._query_svg_sub_geometry(svg_id)
+            self._geometry[svg_id] = ret if ok else None
+        geometry = self._geometry[svg_id]
+        if geometry is None:
+            return False, Gdk.Rectangle()
+        return True, geometry
+
+    def _query_svg_sub_geometry(self, svg_id: str) -> Tuple[bool, Gdk.Rectangle]:
+        # Asks librsvg for an SVG element's x- and y-coordinates, width and
         # height.
         ret = Gdk.Rectangle()
         ok, svg_pos = self._handle.get_position_sub(svg_id)
@@ -424,27 +463,58 @@ class MouseMap(Gtk.Container):
         y = (allocation.height - height) / 2 + self.props.border_width
         return round(x), round(y)
 
+    def _get_layer(
+        self, name: str, render: Callable[[cairo.Context], None]
+    ) -> cairo.ImageSurface:
+        # Returns the layer with the given name, rendering it at the current
+        # scale factor with the given function if it is not cached.
+        layer = self._layers.get(name)
+        if layer is None:
+            scale_factor = self.get_scale_factor()
+            layer = cairo.ImageSurface(
+                cairo.FORMAT_ARGB32,
+                self._handle.props.width * scale_factor,
+                self._handle.props.height * scale_factor,
+            )
+            layer.set_device_scale(scale_factor, scale_factor)
+            render(cairo.Context(layer))
+            self._layers[name] = layer
+        return layer
+
+    def _render_leaders(self, cr: cairo.Context) -> None:
+        for child in self._children:
+            self._handle.render_cairo_sub(cr, id=child.svg_path)
+            self._handle.render_cairo_sub(cr, id=child.svg_leader)
+
     def _draw_device(self, cr: cairo.Context) -> None:
         # Draws the SVG into the Cairo context. If there is an element to be
-        # highlighted, it will do as such in a separate surface which will be
-        # used as a mask over the device surface.
+        # highlighted, its rendering is used as a mask to paint it in the
+        # theme's link colour over the device.
         style_context = self.get_style_context()
         style_context.save()
         color = style_context.get_color(Gtk.StateFlags.LINK)
         style_context.restore()
-        cr.set_source_rgba(color.red, color.green, color.blue, 0.5)
-
-        self._handle.render_cairo_sub(cr, id="#Device")
-        if self._highlight_element is not None:
-            svg_surface = cr.get_target()
-            highlight_surface = svg_surface.create_similar(
-                cairo.CONTENT_COLOR_ALPHA,
-                self._handle.props.width,
-                self._handle.props.height,
+
+        key = (self.get_scale_factor(), (color.red, color.green, color.blue))
+        if key != self._layers_key:
+            self._layers.clear()
+            self._layers_key = key
+
+        device = self._get_layer(
+            "device",
+            lambda layer_cr: self._handle.render_cairo_sub(layer_cr, id="#Device"),
+        )
+        cr.set_source_surface(device, 0, 0)
+        cr.paint()
+        highlight_element = self._highlight_element
+        if highlight_element is not None:
+            mask = self._get_layer(
+                highlight_element,
+                lambda layer_cr: self._handle.render_cairo_sub(
+                    layer_cr, id=highlight_element
+                ),
             )
-            highlight_context = cairo.Context(highlight_surface)
-            self._handle.render_cairo_sub(highlight_context, self._highlight_element)
-            cr.mask_surface(highlight_surface, 0, 0)
-        for child in self._children:
-            self._handle.render_cairo_sub(cr, id=child.svg_path)
-            self._handle.render_cairo_sub(cr, id=child.svg_leader)
+            cr.set_source_rgba(color.red, color.green, color.blue, 0.5)
+            cr.mask_surface(mask, 0, 0)
+        cr.set_source_surface(self._get_layer("leaders", self._render_leaders), 0, 0)
+        cr.paint()
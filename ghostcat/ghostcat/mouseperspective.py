@@ -1,14 +1,14 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import collections
+import sys
+
 from gettext import gettext as _
-from typing import Optional
+from typing import Callable, List, Optional, OrderedDict, Tuple
 
-from .buttonspage import ButtonsPage
+from . import devicecache, startuptrace
 from .profilerow import ProfileRow
 from .ghostcatd import RatbagdDevice, RatbagdProfile
-from .resolutionspage import ResolutionsPage
-from .advancedpage import AdvancedPage
-from .ledspage import LedsPage
 from .util.gobject import connect_signal_with_weak_ref
 
 import gi
@@ -17,6 +17,21 @@ gi.require_version("Gtk", "3.0")
 from gi.repository import GLib, GObject, Gtk  # noqa
 
 
+class _LazyPage(Gtk.Box):
+    # A stack child that builds the actual page the first time it is shown.
+
+    def __init__(self, build: Callable[[], Gtk.Widget]) -> None:
+        Gtk.Box.__init__(self)
+        self._build: Optional[Callable[[], Gtk.Widget]] = build
+        self.show()
+
+    def ensure_built(self) -> None:
+        if self._build is not None:
+            self.pack_start(self._build(), True, True, 0)
+            self._build = None
+            startuptrace.mark("first page built")
+
+
 @Gtk.Template(resource_path="/org/freedesktop/GhostCAT/ui/MousePerspective.ui")
 class MousePerspective(Gtk.Overlay):
     """The perspective to configure a mouse."""
@@ -32,12 +47,21 @@ class MousePerspective(Gtk.Overlay):
     notification_error: Gtk.Revealer = Gtk.Template.Child()  # type: ignore
     stack: Gtk.Stack = Gtk.Template.Child()  # type: ignore
 
+    # How many profiles keep their pages around after switching away
+    PROFILE_PAGE_CACHE_SIZE = 3
+
     def __init__(self, *args, **kwargs) -> None:
         """Instantiates a new MousePerspective."""
         Gtk.Overlay.__init__(self, *args, **kwargs)
         self._device: Optional[RatbagdDevice] = None
         self._profile: Optional[RatbagdProfile] = None
         self._notification_error_timeout_id = 0
+        # The stack pages of the most recently shown profiles, least recent
+        # first, as (name, title, page) tuples.
+        self._profile_pages: OrderedDict[int, List[Tuple[str, str, _LazyPage]]] = (
+            collections.OrderedDict()
+        )
+        self.stack.connect("notify::visible-child", self._on_stack_visible_child)
 
     @GObject.Property
     def name(self) -> str:
@@ -57,7 +81,7 @@ class MousePerspective(Gtk.Overlay):
 
     @GObject.Property
     def can_shutdown(self) -> bool:
-        if self._device is None:
+        if self._device is None or self._device.stale:
             return True
 
         """Whether this perspective can safely shutdown."""
@@ -69,7 +93,15 @@ class MousePerspective(Gtk.Overlay):
         return self._device
 
     def set_device(self, device: RatbagdDevice) -> None:
+        self._drop_profile_pages()
         self._device = device
+        # A device restored from the cache is only shown until ghostcatd is
+        # ready, it must not be changed.
+        self.set_sensitive(not device.stale)
+        self._titlebar.set_sensitive(not device.stale)
+        self.set_tooltip_text(
+            _("Waiting for ghostcatd to load the device…") if device.stale else None
+        )
         connect_signal_with_weak_ref(
             self, device, "resync", lambda _: self._show_notification_error()
         )
@@ -115,17 +147,58 @@ class MousePerspective(Gtk.Overlay):
 
         self._profile = profile
 
-        self.stack.foreach(Gtk.Widget.destroy)
+        for child in self.stack.get_children():
+            self.stack.remove(child)
+
+        # Going back to a recently shown profile reuses its pages
+        pages = self._profile_pages.pop(profile.index, None)
+        if pages is None:
+            pages = self._new_profile_pages(self._device, profile)
+        self._profile_pages[profile.index] = pages
+        while len(self._profile_pages) > self.PROFILE_PAGE_CACHE_SIZE:
+            _index, evicted = self._profile_pages.popitem(last=False)
+            for _name, _title, page in evicted:
+                page.destroy()
+
+        for name, title, page in pages:
+            self.stack.add_titled(page, name, title)
+
+        self._on_profile_notify_dirty(profile, None)
+
+    def _new_profile_pages(
+        self, device: RatbagdDevice, profile: RatbagdProfile
+    ) -> List[Tuple[str, str, _LazyPage]]:
+        # Every page creates its own MouseMap and connects to all of the
+        # profile's children, only do so once the user looks at it. The page
+        # modules load their templates, cairo and librsvg when imported, so
+        # they are only imported then, too.
+        def resolutions_page():
+            from .resolutionspage import ResolutionsPage
+
+            return ResolutionsPage(device, profile)
+
+        def buttons_page():
+            from .buttonspage import ButtonsPage
+
+            return ButtonsPage(device, profile)
+
+        def leds_page():
+            from .ledspage import LedsPage
+
+            return LedsPage(device, profile)
+
+        def advanced_page():
+            from .advancedpage import AdvancedPage
+
+            return AdvancedPage(device, profile)
+
+        pages = []
         if profile.resolutions:
-            self.stack.add_titled(
-                ResolutionsPage(self._device, profile), "resolutions", _("Resolutions")
-            )
+            pages.append(("resolutions", _("Resolutions"), _LazyPage(resolutions_page)))
         if profile.buttons:
-            self.stack.add_titled(
-                ButtonsPage(self._device, profile), "buttons", _("Buttons")
-            )
+            pages.append(("buttons", _("Buttons"), _LazyPage(buttons_page)))
         if profile.leds:
-            self.stack.add_titled(LedsPage(self._device, profile), "leds", _("LEDs"))
+            pages.append(("leds", _("LEDs"), _LazyPage(leds_page)))
         # TODO: get rid of this duplicated logic.
         are_report_rates_supported = (
             profile.report_rate != 0 and len(profile.report_rates) != 0
@@ -135,11 +208,23 @@ class MousePerspective(Gtk.Overlay):
             or profile.debounces
             or are_report_rates_supported
         ):
-            self.stack.add_titled(
-                AdvancedPage(self._device, profile), "advanced", _("Advanced")
-            )
-
-        self._on_profile_notify_dirty(profile, None)
+            pages.append(("advanced", _("Advanced"), _LazyPage(advanced_page)))
+        return pages
+
+    def _drop_profile_pages(self) -> None:
+        for child in self.stack.get_children():
+            self.stack.remove(child)
+        for pages in self._profile_pages.values():
+            for _name, _title, page in pages:
+                page.destroy()
+        self._profile_pages.clear()
+
+    def _on_stack_visible_child(
+        self, stack: Gtk.Stack, pspec: GObject.ParamSpec
+    ) -> None:
+        page = stack.get_visible_child()
+        if page is not None:
+            page.ensure_built()
 
     def _hide_notification_error(self) -> None:
         if self._notification_error_timeout_id != 0:
@@ -166,7 +251,15 @@ class MousePerspective(Gtk.Overlay):
     @Gtk.Template.Callback("_on_save_button_clicked")
     def _on_save_button_clicked(self, _button: Gtk.Button) -> None:
         assert self._device is not None
-        self._device.commit()
+        device = self._device
+
+        def on_committed(_result, error):
+            if error is None:
+                devicecache.save(device)
+            else:
+                print(error, file=sys.stderr)
+
+        device.commit_async(callback=on_committed)
 
     @Gtk.Template.Callback("_on_notification_error_close_clicked")
     def _on_notification_error_close_clicked(self, button: Gtk.Button) -> None:
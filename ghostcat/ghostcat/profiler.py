@@ -0,0 +1,251 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""This module contains a profiler for developers: it records how long each
+frame, each MouseMap draw, each D-Bus call and the dispatch of each signal
+from ghostcatd take, shows a summary on top of the window and exports
+everything as a Chrome trace, see chrome://tracing or
+https://ui.perfetto.dev.
+
+Recording is toggled with Ctrl+Shift+P, or starts right away if
+GHOSTCAT_PROFILE is set. The trace is written when recording stops, at the
+latest when the application quits. If the value of GHOSTCAT_PROFILE is a
+path, the trace is written there, otherwise to the user's cache directory."""
+
+import collections
+import contextlib
+import json
+import os
+import sys
+import time
+
+from typing import Any, Deque, Dict, Optional
+
+from .ghostcatd import disable_dbus_stats, enable_dbus_stats
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gdk, GLib, GObject, Gtk  # noqa
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Profiler(GObject.Object):
+    """Collects trace events while recording."""
+
+    # How far back the summary in the overlay looks, in seconds
+    SUMMARY_PERIOD = 1.0
+    # Only the most recent events are kept, a few minutes' worth
+    MAX_EVENTS = 100000
+
+    def __init__(self) -> None:
+        GObject.Object.__init__(self)
+        self._recording = False
+        self._events: Deque[Dict[str, Any]] = collections.deque(maxlen=self.MAX_EVENTS)
+        self._start = time.perf_counter()
+        self._stats = None
+
+    @GObject.Property(type=bool, default=False)
+    def recording(self) -> bool:
+        return self._recording
+
+    def start(self) -> None:
+        if self._recording:
+            return
+        self._events.clear()
+        self._stats = enable_dbus_stats()
+        self._stats.listeners.append(self._on_dbus_call)
+        self._recording = True
+        self.notify("recording")
+
+    def stop(self) -> Optional[str]:
+        """Stops recording and writes the trace. Returns the path it was
+        written to, or None if it could not be written."""
+        if not self._recording:
+            return None
+        self._recording = False
+        if self._stats is not None:
+            self._stats.listeners.remove(self._on_dbus_call)
+            self._stats = None
+            disable_dbus_stats()
+        self.notify("recording")
+        return self._export()
+
+    def toggle(self) -> None:
+        if self._recording:
+            self.stop()
+        else:
+            self.start()
+
+    def add_event(self, name: str, category: str, start: float, end: float) -> None:
+        """Records an event that lasted from start to end, both as
+        time.perf_counter() values."""
+        if not self._recording:
+            return
+        self._events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self._start) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": 1,
+            }
+        )
+
+    @contextlib.contextmanager
+    def _span(self, name: str, category: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_event(name, category, start, time.perf_counter())
+
+    def span(self, name: str, category: str):
+        """Returns a context manager recording the time spent in it."""
+        if not self._recording:
+            return _NO_SPAN
+        return self._span(name, category)
+
+    def summarize(self) -> Dict[str, float]:
+        """Returns the time spent per category in the last SUMMARY_PERIOD,
+        in ms, and the number of frames as "frames"."""
+        since = (time.perf_counter() - self._start - self.SUMMARY_PERIOD) * 1e6
+        summary: Dict[str, float] = {"frames": 0}
+        # Events are added when they end, so in the order of their end
+        for event in reversed(self._events):
+            if event["ts"] + event["dur"] < since:
+                break
+            category = event["cat"]
+            summary[category] = summary.get(category, 0.0) + event["dur"] / 1000
+            if category == "frame":
+                summary["frames"] += 1
+        return summary
+
+    def _on_dbus_call(self, name: str, start: float, end: float, error) -> None:
+        category = "signal" if name.endswith("(signal)") else "dbus"
+        self.add_event(name, category, start, end)
+
+    def _export(self) -> Optional[str]:
+        path = os.environ.get("GHOSTCAT_PROFILE", "")
+        if not path or path == "1":
+            path = os.path.join(
+                GLib.get_user_cache_dir(),
+                "ghostcat",
+                time.strftime("trace-%Y%m%d-%H%M%S.json"),
+            )
+        trace = {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        except OSError as e:
+            print(f"Cannot write trace to {path}: {e}", file=sys.stderr)
+            return None
+        print(f"Trace written to {path}", file=sys.stderr)
+        return path
+
+
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Profiler:
+    global _profiler
+
+    if _profiler is None:
+        _profiler = Profiler()
+        if os.environ.get("GHOSTCAT_PROFILE"):
+            _profiler.start()
+    return _profiler
+
+
+def span(name: str, category: str):
+    """Shorthand for get_profiler().span(), costing a single check while
+    the profiler is not recording."""
+    if _profiler is None or not _profiler.recording:
+        return _NO_SPAN
+    return _profiler.span(name, category)
+
+
+class ProfilerOverlay(Gtk.Overlay):
+    """Puts the window's content into an overlay, times every frame of the
+    window and shows the summary of the profiler on top while recording."""
+
+    __gtype_name__ = "ProfilerOverlay"
+
+    def __init__(self, window: Gtk.Window, *args, **kwargs) -> None:
+        Gtk.Overlay.__init__(self, *args, **kwargs)
+        self._window = window
+        self._profiler = get_profiler()
+        self._frame_start: Optional[float] = None
+        self._timeout_id = 0
+
+        child = window.get_child()
+        if child is not None:
+            window.remove(child)
+            self.add(child)
+        window.add(self)
+        self.show()
+
+        self._label = Gtk.Label(halign=Gtk.Align.END, valign=Gtk.Align.END)
+        self._label.get_style_context().add_class("osd")
+        self._label.set_margin_end(6)
+        self._label.set_margin_bottom(6)
+        self.add_overlay(self._label)
+        self.set_overlay_pass_through(self._label, True)
+
+        if window.get_realized():
+            self._on_window_realize(window)
+        else:
+            window.connect("realize", self._on_window_realize)
+        self._recording_handler = self._profiler.connect(
+            "notify::recording", self._on_recording_changed
+        )
+        self._on_recording_changed(self._profiler, None)
+        self.connect("destroy", self._on_destroy)
+
+    def _on_destroy(self, widget: Gtk.Widget) -> None:
+        self._profiler.disconnect(self._recording_handler)
+        if self._timeout_id:
+            GLib.source_remove(self._timeout_id)
+            self._timeout_id = 0
+
+    def _on_window_realize(self, window: Gtk.Window) -> None:
+        frame_clock = window.get_frame_clock()
+        frame_clock.connect("layout", self._on_frame_start)
+        frame_clock.connect("after-paint", self._on_frame_end)
+
+    def _on_frame_start(self, frame_clock: Gdk.FrameClock) -> None:
+        self._frame_start = time.perf_counter()
+
+    def _on_frame_end(self, frame_clock: Gdk.FrameClock) -> None:
+        if self._frame_start is not None:
+            self._profiler.add_event(
+                "frame", "frame", self._frame_start, time.perf_counter()
+            )
+            self._frame_start = None
+
+    def _on_recording_changed(
+        self, profiler: Profiler, pspec: Optional[GObject.ParamSpec]
+    ) -> None:
+        self._label.set_visible(profiler.recording)
+        if profiler.recording and not self._timeout_id:
+            self._update_label()
+            # Updating the label draws another frame, don't do so per frame.
+            self._timeout_id = GLib.timeout_add(500, self._update_label)
+        elif not profiler.recording and self._timeout_id:
+            GLib.source_remove(self._timeout_id)
+            self._timeout_id = 0
+
+    def _update_label(self) -> bool:
+        s = self._profiler.summarize()
+        frames = int(s["frames"])
+        frame_ms = s.get("frame", 0.0) / frames if frames else 0.0
+        self._label.set_text(
+            "Recording (Ctrl+Shift+P to stop)\n"
+            f"{frames} frames/s, {frame_ms:.1f} ms/frame\n"
+            f"draw {s.get('draw', 0.0):.1f} ms, D-Bus {s.get('dbus', 0.0):.1f} ms, "
+            f"signals {s.get('signal', 0.0):.1f} ms"
+        )
+        return True
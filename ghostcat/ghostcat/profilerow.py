@@ -52,7 +52,7 @@ class ProfileRow(Gtk.ListBoxRow):
 
     def set_active(self) -> None:
         """Activates the profile paired with this row."""
-        self._profile.set_active()
+        self._profile.set_active_async()
 
     @GObject.Property
     def name(self) -> str:
@@ -141,7 +141,7 @@ class ResolutionRow(Gtk.ListBoxRow):
     def _on_disable_button_toggled(self, togglebutton: Gtk.Button) -> None:
         # The disable button has been toggled, update RatbagdResolution.
         is_disabling = togglebutton.get_active()
-        self._resolution.set_disabled(is_disabling)
+        self._resolution.set_disabled_async(is_disabling)
 
         # Update UI (this calls _apply_button_states which hides apply_label)
         self._on_status_changed(self._resolution, _pspec=None)
@@ -152,14 +152,14 @@ class ResolutionRow(Gtk.ListBoxRow):
     @Gtk.Template.Callback("_on_active_button_clicked")
     def _on_active_button_clicked(self, _togglebutton: Gtk.Button) -> None:
         # The set active button has been clicked, update RatbagdResolution.
-        self._resolution.set_active()
+        self._resolution.set_active_async()
         # Manually update active labels since ghostcatd may not emit change signals
         self.resolutions_page._update_active_labels(self._resolution.index)
 
     @Gtk.Template.Callback("_on_shift_button_clicked")
     def _on_shift_button_clicked(self, _button: Gtk.Button) -> None:
         # The set shift button has been clicked, update RatbagdResolution.
-        self._resolution.set_dpi_shift_target()
+        self._resolution.set_dpi_shift_target_async()
         # Manually update shift target since ghostcatd may not emit change signals
         self.resolutions_page._update_shift_target(self._resolution.index)
 
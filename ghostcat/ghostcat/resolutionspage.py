@@ -11,7 +11,7 @@ from .util.gobject import connect_signal_with_weak_ref
 import gi
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gio, GLib, Gtk  # noqa
+from gi.repository import Gtk  # noqa
 
 
 @Gtk.Template(resource_path="/org/freedesktop/GhostCAT/ui/ResolutionsPage.ui")
@@ -101,11 +101,6 @@ class ResolutionsPage(Gtk.Box):
         # Hide the separate shift target frame — all resolutions are in one list now
         self.shift_target_frame.set_visible(False)
 
-        # Poll active resolution from D-Bus every 2 seconds to detect
-        # physical DPI button presses on the mouse
-        self._poll_timer_id = GLib.timeout_add_seconds(2, self._poll_active_from_dbus)
-        self.connect("destroy", self._on_destroy)
-
     def _on_button_changed(self, button: RatbagdButton, _pspec) -> None:
         """Called when a button's action changes."""
         self._update_button_label(button)
@@ -173,7 +168,10 @@ class ResolutionsPage(Gtk.Box):
         self._apply_button_states()
 
     def _on_active_changed(self, resolution: RatbagdResolution, _pspec) -> None:
-        """Called when a resolution's active status changes via ghostcatd signal."""
+        """Called when a resolution's active status changes via ghostcatd signal.
+
+        ghostcatd polls the device for the active resolution and emits
+        PropertiesChanged, so physical DPI button presses arrive here too."""
         if resolution.is_active:
             self._active_index = resolution.index
         self._apply_button_states()
@@ -214,33 +212,3 @@ class ResolutionsPage(Gtk.Box):
 
             # Show shift label on current shift target
             row.shift_label.set_visible(is_shift)
-
-    def _poll_active_from_dbus(self) -> bool:
-        """Poll D-Bus for active resolution changes from physical button presses."""
-        if not self._profile.is_active:
-            return True  # Keep polling but skip work for inactive profiles
-
-        try:
-            for resolution in self._resolutions:
-                result = resolution._proxy.call_sync(
-                    "org.freedesktop.DBus.Properties.Get",
-                    GLib.Variant("(ss)", (resolution._interface, "IsActive")),
-                    Gio.DBusCallFlags.NO_AUTO_START,
-                    500,
-                    None,
-                )
-                is_active = result.unpack()[0]
-                if is_active and resolution.index != self._active_index:
-                    self._active_index = resolution.index
-                    self._apply_button_states()
-                    break
-        except GLib.Error:
-            pass  # Silently ignore D-Bus errors during polling
-
-        return True  # Keep the timer running
-
-    def _on_destroy(self, _widget) -> None:
-        """Clean up the polling timer when the widget is destroyed."""
-        if self._poll_timer_id:
-            GLib.source_remove(self._poll_timer_id)
-            self._poll_timer_id = 0
@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""This module prints a timestamp for each stage of the startup to stderr when
+GHOSTCAT_STARTUP_TRACE is set. Timestamps are relative to the start of the
+process, so they include starting the interpreter and loading GTK."""
+
+import os
+import sys
+import time
+
+_enabled = bool(os.environ.get("GHOSTCAT_STARTUP_TRACE"))
+_stages = set()
+
+
+def _get_process_start() -> float:
+    # The time the process started at, in seconds since boot.
+    try:
+        with open("/proc/self/stat") as f:
+            stat = f.read()
+        # The command name may contain spaces, the start time is the 22nd
+        # field and the 20th after it.
+        ticks = int(stat.rsplit(")", 1)[1].split()[19])
+        return ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+
+_start = _get_process_start() if _enabled else 0.0
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def mark(stage: str) -> None:
+    """Prints the time elapsed since startup, the first time the given stage
+    is reached."""
+    if not _enabled or stage in _stages:
+        return
+    _stages.add(stage)
+    elapsed = (time.clock_gettime(time.CLOCK_BOOTTIME) - _start) * 1000
+    print(f"startup: {elapsed:8.1f}ms {stage}", file=sys.stderr)
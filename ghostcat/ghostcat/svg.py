@@ -1,38 +1,129 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
-from typing import Optional
-from gi.repository import Gio  # noqa
+"""This module looks up the SVG of a device model in the gresource bundle.
+Every SVG is parsed once per process and shared by all widgets showing it
+until evict() is called for the model."""
+
+from typing import Any, Dict, Optional
 
 import configparser
+import json
+import threading
 
+import gi
 
-def get_svg(model: str) -> Optional[bytes]:
-    resource = Gio.resources_lookup_data(
-        "/org/freedesktop/GhostCAT/svgs/svg-lookup.ini", Gio.ResourceLookupFlags.NONE
-    )
+gi.require_version("Rsvg", "2.0")
+from gi.repository import Gdk, Gio, Rsvg  # noqa
 
-    data = resource.get_data()
-    assert data is not None
-    config = configparser.ConfigParser()
-    config.read_string(data.decode("utf-8"), source="svg-lookup.ini")
-    assert config.sections()
 
-    filename = "fallback.svg"
+class SvgAsset:
+    """A device SVG parsed by librsvg, with the metadata extracted from it at
+    build time, see data/svgmetadata.py. The geometry of its elements is
+    filled in from the metadata by the first MouseMap showing it."""
+
+    def __init__(self, filename: str, data: bytes, metadata: Dict[str, Any]) -> None:
+        self.filename = filename
+        self.data = data
+        handle = Rsvg.Handle.new_from_data(data)
+        assert handle is not None
+        self.handle: Rsvg.Handle = handle
+        self.elements: Dict[str, Dict[str, Any]] = metadata.get("elements", {})
+        self.geometry: Dict[str, Optional[Gdk.Rectangle]] = {}
+
+
+# Maps each DeviceMatch entry of svg-lookup.ini to its SVG filename
+_svg_lookup: Optional[Dict[str, str]] = None
+# The metadata of every SVG, by filename
+_svg_metadata: Optional[Dict[str, Dict[str, Any]]] = None
+# The parsed SVGs, by filename
+_assets: Dict[str, SvgAsset] = {}
+# Guards the above, get_svg() is also called from the thumbnail worker
+_lock = threading.Lock()
+
+
+def _get_svg_lookup() -> Dict[str, str]:
+    global _svg_lookup
+
+    with _lock:
+        if _svg_lookup is not None:
+            return _svg_lookup
+        resource = Gio.resources_lookup_data(
+            "/org/freedesktop/GhostCAT/svgs/svg-lookup.ini",
+            Gio.ResourceLookupFlags.NONE,
+        )
+
+        data = resource.get_data()
+        assert data is not None
+        config = configparser.ConfigParser()
+        config.read_string(data.decode("utf-8"), source="svg-lookup.ini")
+        assert config.sections()
+
+        lookup: Dict[str, str] = {}
+        for s in config.sections():
+            for match in config[s]["DeviceMatch"].split(";"):
+                # The first section listing a device wins
+                lookup.setdefault(match, config[s]["Svg"])
+        _svg_lookup = lookup
+        return lookup
+
+
+def _get_svg_metadata() -> Dict[str, Dict[str, Any]]:
+    global _svg_metadata
+
+    with _lock:
+        if _svg_metadata is None:
+            resource = Gio.resources_lookup_data(
+                "/org/freedesktop/GhostCAT/svg-metadata.json",
+                Gio.ResourceLookupFlags.NONE,
+            )
+            data = resource.get_data()
+            assert data is not None
+            _svg_metadata = json.loads(data.decode("utf-8"))
+        return _svg_metadata
 
+
+def _get_svg_filename(model: str) -> str:
     if model.startswith(("usb:", "bluetooth:")):
         bus, vid, pid, version = model.split(":")
         # Where the version is 0 (virtually all devices) we drop it. This
         # way the DeviceMatch lines are less confusing.
         usbid = ":".join([bus, vid, pid]) if int(version) == 0 else model
+        return _get_svg_lookup().get(usbid, "fallback.svg")
+    return "fallback.svg"
 
-        for s in config.sections():
-            matches = config[s]["DeviceMatch"].split(";")
-            if usbid in matches:
-                filename = config[s]["Svg"]
-                break
 
+def _load_svg_data(filename: str) -> bytes:
     resource = Gio.resources_lookup_data(
         f"/org/freedesktop/GhostCAT/svgs/{filename}", Gio.ResourceLookupFlags.NONE
     )
+    data = resource.get_data()
+    assert data is not None
+    return data
+
+
+def get_svg(model: str) -> Optional[bytes]:
+    """Returns the SVG of the given model without parsing it."""
+    filename = _get_svg_filename(model)
+    with _lock:
+        asset = _assets.get(filename)
+    return asset.data if asset is not None else _load_svg_data(filename)
+
+
+def get_svg_asset(model: str) -> SvgAsset:
+    filename = _get_svg_filename(model)
+    with _lock:
+        asset = _assets.get(filename)
+    if asset is None:
+        data = _load_svg_data(filename)
+        asset = SvgAsset(filename, data, _get_svg_metadata().get(filename, {}))
+        with _lock:
+            asset = _assets.setdefault(filename, asset)
+    return asset
+
 
-    return resource.get_data()
+def evict(model: str) -> None:
+    """Drops the SVG of the given model from the store, e.g. when the device
+    disappeared. Widgets still showing it keep their reference."""
+    filename = _get_svg_filename(model)
+    with _lock:
+        _assets.pop(filename, None)
@@ -0,0 +1,190 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""This module renders the thumbnails of the device SVGs shown by DeviceRow.
+Each thumbnail is rendered once and stored as PNG in the user's cache
+directory, named after the hash of the SVG so an updated SVG gets a new one.
+A link named after the hash of the model points to the PNG last shown for
+it, so later starts find it without loading the SVG. Loading and rendering
+the SVG happens on a worker thread, the callbacks are invoked on the main
+thread."""
+
+import hashlib
+import os
+import queue
+import sys
+import threading
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import gi
+
+gi.require_version("GdkPixbuf", "2.0")
+gi.require_version("Rsvg", "2.0")
+from gi.repository import GdkPixbuf, GLib  # noqa
+
+# The width and height of a thumbnail, in pixels
+THUMBNAIL_SIZE = 50
+
+ThumbnailCallback = Callable[[Optional[GdkPixbuf.Pixbuf]], None]
+
+# The callbacks waiting for each model's thumbnail to be checked, by model,
+# each with whether it was already invoked with the cached thumbnail
+_pending: Dict[str, List[Tuple[ThumbnailCallback, bool]]] = {}
+# The PNG of each model checked against its current SVG, None if it has none
+_paths: Dict[str, Optional[str]] = {}
+_queue: "queue.Queue[str]" = queue.Queue()
+_worker: Optional[threading.Thread] = None
+
+
+def get_cache_dir() -> str:
+    return os.path.join(GLib.get_user_cache_dir(), "ghostcat", "thumbnails")
+
+
+def _get_model_path(model: str) -> str:
+    digest = hashlib.sha1(model.encode()).hexdigest()
+    return os.path.join(get_cache_dir(), f"model-{digest}-{THUMBNAIL_SIZE}.png")
+
+
+def _get_cache_path(data: bytes) -> str:
+    digest = hashlib.sha1(data).hexdigest()
+    return os.path.join(get_cache_dir(), f"{digest}-{THUMBNAIL_SIZE}.png")
+
+
+def _load(path: str) -> Optional[GdkPixbuf.Pixbuf]:
+    try:
+        return GdkPixbuf.Pixbuf.new_from_file(path)
+    except GLib.Error:
+        # Not cached yet, or unreadable. Either way it is rendered again.
+        return None
+
+
+def _render(data: bytes, path: str) -> Optional[GdkPixbuf.Pixbuf]:
+    # Runs on the worker thread. Imported here so librsvg is loaded there,
+    # and only if a thumbnail is missing.
+    from gi.repository import Rsvg
+
+    try:
+        handle = Rsvg.Handle.new_from_data(data)
+        pixbuf = handle.get_pixbuf_sub("#Device")
+        if pixbuf is None:
+            return None
+        pixbuf = pixbuf.scale_simple(
+            THUMBNAIL_SIZE, THUMBNAIL_SIZE, GdkPixbuf.InterpType.BILINEAR
+        )
+        if pixbuf is None:
+            return None
+    except GLib.Error as e:
+        print(f"Cannot render thumbnail: {e}", file=sys.stderr)
+        return None
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Saved to a temporary file and renamed so no other instance ever
+        # reads a truncated thumbnail.
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        pixbuf.savev(tmp, "png", [], [])
+        os.replace(tmp, path)
+    except (OSError, GLib.Error) as e:
+        print(f"Cannot cache thumbnail {path}: {e}", file=sys.stderr)
+    return pixbuf
+
+
+def _link(model: str, path: str) -> None:
+    # Points the model's link to the given PNG, replacing it atomically.
+    model_path = _get_model_path(model)
+    try:
+        tmp = f"{model_path}.{threading.get_ident()}.tmp"
+        os.symlink(os.path.basename(path), tmp)
+        os.replace(tmp, model_path)
+    except OSError as e:
+        print(f"Cannot cache thumbnail {model_path}: {e}", file=sys.stderr)
+
+
+def _check(model: str) -> None:
+    # Runs on the worker thread. Renders the thumbnail unless the PNG for
+    # the model's current SVG exists already.
+    from .svg import get_svg
+
+    data = get_svg(model)
+    if data is None:
+        GLib.idle_add(_on_checked, model, None, True, None)
+        return
+    path = _get_cache_path(data)
+    if os.path.exists(path):
+        pixbuf = None
+        try:
+            changed = os.readlink(_get_model_path(model)) != os.path.basename(path)
+        except OSError:
+            changed = True
+    else:
+        pixbuf = _render(data, path)
+        changed = True
+    if changed and os.path.exists(path):
+        _link(model, path)
+    GLib.idle_add(_on_checked, model, path, changed, pixbuf)
+
+
+def _run_worker() -> None:
+    while True:
+        model = _queue.get()
+        try:
+            _check(model)
+        except Exception as e:
+            print(f"Cannot check thumbnail of {model}: {e}", file=sys.stderr)
+            # Not memoized, so it is tried again the next time it is shown
+            GLib.idle_add(_on_failed, model)
+
+
+def _on_checked(
+    model: str,
+    path: Optional[str],
+    changed: bool,
+    pixbuf: Optional[GdkPixbuf.Pixbuf],
+) -> bool:
+    _paths[model] = path
+    callbacks = _pending.pop(model, [])
+    if pixbuf is None and path is not None:
+        pixbuf = _load(path)
+    for callback, served in callbacks:
+        # Those shown the cached thumbnail only need the new one
+        if changed or not served:
+            callback(pixbuf)
+    return False
+
+
+def _on_failed(model: str) -> bool:
+    for callback, served in _pending.pop(model, []):
+        if not served:
+            callback(None)
+    return False
+
+
+def load_thumbnail(model: str, callback: ThumbnailCallback) -> None:
+    """Calls callback with the thumbnail of the given model's device, or with
+    None if its SVG has no Device layer. If the thumbnail is cached, the
+    callback is invoked right away, otherwise once it is rendered. If the
+    cached thumbnail turns out to be from an older SVG of the model, the
+    callback is invoked again with the new one."""
+    global _worker
+
+    if model in _paths:
+        path = _paths[model]
+        callback(_load(path) if path is not None else None)
+        return
+
+    # Shown right away, the worker checks it is the current one
+    pixbuf = _load(_get_model_path(model))
+    if pixbuf is not None:
+        callback(pixbuf)
+    served = pixbuf is not None
+    if model in _pending:
+        _pending[model].append((callback, served))
+        return
+
+    _pending[model] = [(callback, served)]
+    if _worker is None:
+        _worker = threading.Thread(
+            target=_run_worker, name="ghostcat-thumbnails", daemon=True
+        )
+        _worker.start()
+    _queue.put(model)
@@ -1,22 +1,29 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import collections
+import sys
 from gettext import gettext as _
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, OrderedDict
 
+from . import devicecache, startuptrace
+from .profiler import Profiler, ProfilerOverlay, get_profiler
 from .errorperspective import ErrorPerspective
 from .mouseperspective import MousePerspective
 from .welcomeperspective import WelcomePerspective
 from .ghostcatd import (
+    RatbagError,
     Ratbagd,
+    RatbagdDBusTimeoutError,
     RatbagdDevice,
     RatbagdIncompatibleError,
     RatbagdUnavailableError,
 )
+from .util.gobject import connect_signal_with_weak_ref
 
 import gi
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gdk, GLib, Gtk, Gio  # noqa
+from gi.repository import Gdk, GLib, GObject, Gtk, Gio  # noqa
 
 
 @Gtk.Template(resource_path="/org/freedesktop/GhostCAT/ui/Window.ui")
@@ -31,6 +38,11 @@ class Window(Gtk.ApplicationWindow):
     stack_perspectives: Gtk.Stack = Gtk.Template.Child()  # type: ignore
     stack_titlebar: Gtk.Stack = Gtk.Template.Child()  # type: ignore
 
+    # How many devices keep their perspective around after switching away.
+    # Each perspective holds the pages of at most
+    # MousePerspective.PROFILE_PAGE_CACHE_SIZE profiles.
+    MOUSE_PERSPECTIVE_CACHE_SIZE = 4
+
     def __init__(self, init_ghostcatd_cb: Callable[[], Ratbagd], *args, **kwargs) -> None:
         """Instantiates a new Window.
 
@@ -39,8 +51,51 @@ class Window(Gtk.ApplicationWindow):
         Gtk.ApplicationWindow.__init__(self, *args, **kwargs)
 
         self.set_icon_name("org.freedesktop.GhostCAT")
+        self._profiler_overlay: Optional[ProfilerOverlay] = None
+        profiler = get_profiler()
+        profiler.connect("notify::recording", self._on_profiler_recording)
+        self._on_profiler_recording(profiler, None)
+        if startuptrace.enabled():
+            self.connect_after("draw", lambda *args: startuptrace.mark("first frame"))
+
+        self._ratbag: Optional[Ratbagd] = None
+        # The perspectives of the most recently shown devices by device ID,
+        # least recent first. Only one of them is in the stacks at a time.
+        self._mouse_perspectives: OrderedDict[str, MousePerspective] = (
+            collections.OrderedDict()
+        )
 
         self._add_perspective(ErrorPerspective(), None)
+
+        # Connecting to ghostcatd can take a while, e.g. when it is still
+        # probing a wireless device. Show the device from the last session
+        # right away and connect once that is on screen.
+        cached_device = devicecache.load_last()
+        if cached_device is None:
+            self._init_ghostcatd(init_ghostcatd_cb)
+            return
+
+        mouse_perspective = MousePerspective()
+        self.stack_perspectives.add_named(mouse_perspective, mouse_perspective.name)
+        self.stack_titlebar.add_named(
+            mouse_perspective.titlebar, mouse_perspective.name
+        )
+        self._perspective_add_primary_menu(mouse_perspective)
+        self._present_mouse_perspective(cached_device)
+        self._first_draw_handler = self.connect_after(
+            "draw", self._on_first_draw, init_ghostcatd_cb
+        )
+
+    def _on_first_draw(self, window, cr, init_ghostcatd_cb) -> bool:
+        self.disconnect(self._first_draw_handler)
+        GLib.idle_add(self._on_idle_init_ghostcatd, init_ghostcatd_cb)
+        return False
+
+    def _on_idle_init_ghostcatd(self, init_ghostcatd_cb) -> bool:
+        self._init_ghostcatd(init_ghostcatd_cb)
+        return False
+
+    def _init_ghostcatd(self, init_ghostcatd_cb: Callable[[], Ratbagd]) -> None:
         try:
             ratbag = init_ghostcatd_cb()
         except RatbagdUnavailableError:
@@ -60,8 +115,16 @@ class Window(Gtk.ApplicationWindow):
             )
             return
 
-        for perspective in [MousePerspective(), WelcomePerspective()]:
-            self._add_perspective(perspective, ratbag)
+        self._ratbag = ratbag
+        mouse_perspective = self.stack_perspectives.get_child_by_name(
+            "mouse_perspective"
+        )
+        if mouse_perspective is None:
+            self._add_perspective(MousePerspective(), ratbag)
+        else:
+            # Already showing the cached device
+            self._perspective_add_back_button(mouse_perspective, ratbag)
+        self._add_perspective(WelcomePerspective(), ratbag)
 
         welcome_perspective: WelcomePerspective = self._get_child("welcome_perspective")  # type: ignore
         welcome_perspective.connect("device-selected", self._on_device_selected)
@@ -81,7 +144,12 @@ class Window(Gtk.ApplicationWindow):
             self._present_welcome_perspective(ratbag.devices)
 
     def do_delete_event(self, event: Gdk.Event) -> bool:
-        for perspective in self.stack_perspectives.get_children():
+        # Changes held back by the write delay are not dirty yet
+        self._flush_writes()
+        perspectives = self.stack_perspectives.get_children() + [
+            p for p in self._mouse_perspectives.values() if p.get_parent() is None
+        ]
+        for perspective in perspectives:
             if not perspective.can_shutdown:
                 dialog = Gtk.MessageDialog(
                     self,
@@ -97,6 +165,21 @@ class Window(Gtk.ApplicationWindow):
                     return Gdk.EVENT_STOP
         return Gdk.EVENT_PROPAGATE
 
+    def _flush_writes(self) -> None:
+        if self._ratbag is None:
+            return
+        try:
+            self._ratbag.flush()
+        except (GLib.Error, RatbagError, RatbagdDBusTimeoutError) as e:
+            print(f"Cannot write the last changes: {e}", file=sys.stderr)
+
+    def _on_profiler_recording(
+        self, profiler: Profiler, pspec: Optional[GObject.ParamSpec]
+    ) -> None:
+        # The overlay is only added once the profiler is first used
+        if profiler.recording and self._profiler_overlay is None:
+            self._profiler_overlay = ProfilerOverlay(self)
+
     def _on_daemon_disappeared(self, ratbag: Ratbagd) -> None:
         self._present_error_perspective(
             _("Ooops. ghostcatd has disappeared"), _("Please restart GhostCAT")
@@ -120,6 +203,13 @@ class Window(Gtk.ApplicationWindow):
     def _on_device_removed(self, ratbag: Ratbagd, device: RatbagdDevice) -> None:
         mouse_perspective: MousePerspective = self._get_child("mouse_perspective")  # type: ignore
 
+        if not any(d.model == device.model for d in ratbag.devices):
+            # Imported here as it loads librsvg, which startup doesn't need
+            from . import svg
+
+            svg.evict(device.model)
+        self._drop_mouse_perspective(device.id)
+
         if device is mouse_perspective.device:
             # The current device disconnected, which can only happen from the
             # mouse perspective as we'd otherwise be in the welcome screen with
@@ -167,11 +257,16 @@ class Window(Gtk.ApplicationWindow):
     def _present_mouse_perspective(self, device: RatbagdDevice) -> None:
         # Present the mouse configuration perspective for the given device.
         try:
-            mouse_perspective: MousePerspective = self._get_child("mouse_perspective")  # type: ignore
-            mouse_perspective.set_device(device)
+            mouse_perspective = self._get_mouse_perspective(device)
+            self._show_mouse_perspective(mouse_perspective)
 
             self.stack_titlebar.set_visible_child_name(mouse_perspective.name)
             self.stack_perspectives.set_visible_child_name(mouse_perspective.name)
+            startuptrace.mark(
+                "cached device shown" if device.stale else "device hydrated"
+            )
+            # This is what the next launch shows until ghostcatd is ready
+            devicecache.save(device)
         except ValueError as e:
             self._present_error_perspective(_("Cannot display device SVG"), str(e))
         except GLib.Error as e:
@@ -189,6 +284,67 @@ class Window(Gtk.ApplicationWindow):
                     _("Unknown exception occurred"), e.message
                 )
 
+    def _get_mouse_perspective(self, device: RatbagdDevice) -> MousePerspective:
+        # Returns the perspective showing the given device, reusing the one
+        # from the last time the device was shown if it is still cached.
+        mouse_perspective = self._mouse_perspectives.get(device.id)
+        if mouse_perspective is not None and mouse_perspective.device is device:
+            self._mouse_perspectives.move_to_end(device.id)
+            return mouse_perspective
+        self._drop_mouse_perspective(device.id)
+
+        current: MousePerspective = self._get_child("mouse_perspective")  # type: ignore
+        if current in self._mouse_perspectives.values():
+            assert self._ratbag is not None
+            mouse_perspective = MousePerspective()
+            self._perspective_add_back_button(mouse_perspective, self._ratbag)
+            self._perspective_add_primary_menu(mouse_perspective)
+        else:
+            # Not showing a device yet, or only one restored from the cache
+            mouse_perspective = current
+        mouse_perspective.set_device(device)
+
+        if not device.stale:
+            self._mouse_perspectives[device.id] = mouse_perspective
+            connect_signal_with_weak_ref(
+                mouse_perspective,
+                device,
+                "resync",
+                lambda device: self._drop_mouse_perspective(device.id),
+            )
+            while len(self._mouse_perspectives) > self.MOUSE_PERSPECTIVE_CACHE_SIZE:
+                _id, evicted = self._mouse_perspectives.popitem(last=False)
+                if evicted is not current:
+                    self._destroy_mouse_perspective(evicted)
+        return mouse_perspective
+
+    def _show_mouse_perspective(self, mouse_perspective: MousePerspective) -> None:
+        # Puts the given perspective in the stacks in place of the current one,
+        # which is destroyed unless it is cached.
+        current: MousePerspective = self._get_child("mouse_perspective")  # type: ignore
+        if current is mouse_perspective:
+            return
+
+        self.stack_perspectives.remove(current)
+        self.stack_titlebar.remove(current.titlebar)
+        if current not in self._mouse_perspectives.values():
+            self._destroy_mouse_perspective(current)
+        self.stack_perspectives.add_named(mouse_perspective, mouse_perspective.name)
+        self.stack_titlebar.add_named(
+            mouse_perspective.titlebar, mouse_perspective.name
+        )
+
+    def _drop_mouse_perspective(self, device_id: str) -> None:
+        # Drops the cached perspective of the given device. The perspective
+        # currently shown is only destroyed once it is replaced.
+        mouse_perspective = self._mouse_perspectives.pop(device_id, None)
+        if mouse_perspective is not None and mouse_perspective.get_parent() is None:
+            self._destroy_mouse_perspective(mouse_perspective)
+
+    def _destroy_mouse_perspective(self, mouse_perspective: MousePerspective) -> None:
+        mouse_perspective.titlebar.destroy()
+        mouse_perspective.destroy()
+
     def _present_error_perspective(self, message: str, detail: str) -> None:
         # Present the error perspective informing the user of any errors.
         error_perspective: ErrorPerspective = self._get_child("error_perspective")  # type: ignore
@@ -217,10 +373,13 @@ class Window(Gtk.ApplicationWindow):
             lambda _, ratbag: self._present_welcome_perspective(ratbag.devices),
             ratbag,
         )
-        ratbag.connect(
+        handler = ratbag.connect(
             "notify::devices",
             lambda ratbag, _: button_back.set_visible(len(ratbag.devices) > 1),
         )
+        # The perspective may be destroyed long before ratbag, e.g. when it
+        # drops out of the cache
+        button_back.connect("destroy", lambda _: ratbag.disconnect(handler))
         perspective.titlebar.add(button_back)
         # Place the button first in the titlebar.
         perspective.titlebar.child_set_property(button_back, "position", 0)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+#
+# Checks the search of the ButtonDialog mapping list.
+
+import argparse
+import sys
+import unittest
+from pathlib import Path
+
+import gi
+
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio  # noqa: E402
+
+buttondialog = None
+
+
+class TestButtonDialogSearch(unittest.TestCase):
+    def setUp(self):
+        self.left = buttondialog._get_button_mapping(0)
+        self.right = buttondialog._get_button_mapping(1)
+        self.other = buttondialog._get_other_mappings()
+        RatbagdButton = buttondialog.RatbagdButton
+        self.wheel_left = (
+            RatbagdButton.ActionType.SPECIAL,
+            RatbagdButton.ActionSpecial.WHEEL_LEFT,
+        )
+        self.disable = (RatbagdButton.ActionType.NONE, None)
+
+    def search(self, search):
+        return buttondialog._search_mappings(search)
+
+    def test_empty(self):
+        self.assertIsNone(self.search(""))
+        self.assertIsNone(self.search("  "))
+
+    def test_word_prefix(self):
+        self.assertEqual(self.search("left"), {self.left, self.wheel_left})
+        self.assertEqual(self.search("Lef"), {self.left, self.wheel_left})
+        self.assertEqual(self.search("whe le"), {self.wheel_left})
+        self.assertEqual(self.search("disa"), {self.disable})
+        self.assertEqual(self.search("eft"), set())
+
+    def test_all_terms(self):
+        self.assertEqual(self.search("mouse cl"), {self.left, self.right})
+        self.assertEqual(self.search("mouse cl ri"), {self.right})
+        self.assertEqual(self.search("  RIGHT   mouse "), {self.right})
+        self.assertEqual(self.search("mouse nosuchword"), set())
+
+    def test_added_once(self):
+        # Asking again adds nothing to the index
+        size = len(buttondialog._search_index)
+        self.assertEqual(buttondialog._get_button_mapping(0), self.left)
+        self.assertEqual(buttondialog._get_other_mappings(), self.other)
+        self.assertEqual(len(buttondialog._search_index), size)
+
+    def test_matches_words(self):
+        self.assertTrue(buttondialog._matches_words("Ctrl + Shift + P", "shi ct"))
+        self.assertTrue(buttondialog._matches_words("Ctrl + Shift + P", ""))
+        self.assertFalse(buttondialog._matches_words("Ctrl + Shift + P", "hift"))
+
+
+def main():
+    global buttondialog
+
+    parser = argparse.ArgumentParser(description="ButtonDialog search test")
+    parser.add_argument("gresource", help="Path to the built ghostcat.gresource")
+    args, remainder = parser.parse_known_args()
+
+    # The dialog's templates are loaded when its module is imported
+    Gio.Resource._register(Gio.resource_load(args.gresource))
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from ghostcat import buttondialog
+
+    unittest.main(argv=[sys.argv[0], *remainder])
+
+
+if __name__ == "__main__":
+    main()
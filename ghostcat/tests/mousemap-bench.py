@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#
+# Allocates a MouseMap at a different size in a loop, the way resizing its
+# window does, and reports how long each layout of the map takes. This is done
+# once reading the element geometry from the MouseMap's index and once
+# querying librsvg for every element like the MouseMap used to.
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import gi
+
+gi.require_version("Gdk", "3.0")
+gi.require_version("Gio", "2.0")
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gdk, Gio, Gtk  # noqa: E402
+
+
+def bench_resize(mousemap, iterations):
+    timings = []
+    allocation = Gdk.Rectangle()
+    for i in range(iterations):
+        allocation.width = 800 + i % 400
+        allocation.height = 600 + i % 300
+        start = time.perf_counter()
+        mousemap.size_allocate(allocation)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="MouseMap resize benchmark")
+    parser.add_argument("gresource", help="Path to the built ghostcat.gresource")
+    parser.add_argument(
+        "--model",
+        default="usb:046d:c083:0",
+        help="The device model whose SVG to lay out",
+    )
+    parser.add_argument("--iterations", type=int, default=1000)
+    ns = parser.parse_args(argv)
+
+    if not Gtk.init_check(None)[0]:
+        print("Cannot open a display", file=sys.stderr)
+        sys.exit(77)
+
+    Gio.Resource._register(Gio.resource_load(ns.gresource))
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from ghostcat.mousemap import MouseMap
+
+    # The MouseMap only needs the model to find the SVG
+    device = SimpleNamespace(model=ns.model)
+
+    start = time.perf_counter()
+    mousemap = MouseMap("#Buttons", device, spacing=20, border_width=20)
+    print(f"load (with index): {(time.perf_counter() - start) * 1000:8.2f}ms")
+
+    for svg_id, geometry in mousemap._geometry.items():
+        if geometry is not None and "-" not in svg_id:
+            mousemap.add(Gtk.Label(label=svg_id), svg_id)
+    window = Gtk.Window()
+    window.add(mousemap)
+    window.show_all()
+
+    for name, lookup in (
+        ("indexed", mousemap._get_svg_sub_geometry),
+        ("rsvg queries", mousemap._query_svg_sub_geometry),
+    ):
+        mousemap._get_svg_sub_geometry = lookup
+        timings = bench_resize(mousemap, ns.iterations)
+        median = statistics.median(timings) * 1000
+        print(f"size_allocate ({name}): {median:8.4f}ms")
+
+    window.destroy()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
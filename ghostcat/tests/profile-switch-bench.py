@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+#
+# Switches a MousePerspective between the profiles of the first device with
+# more than one profile and reports how long each switch takes until the
+# window is idle again. This is done once with an empty page cache, as on the
+# first visit of a profile, and once going back to recently shown profiles.
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import gi
+
+gi.require_version("Gio", "2.0")
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gio, Gtk  # noqa: E402
+
+
+def switch_profile(perspective, profile):
+    start = time.perf_counter()
+    perspective._set_profile(profile)
+    while Gtk.events_pending():
+        Gtk.main_iteration()
+    return time.perf_counter() - start
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Profile switch benchmark")
+    parser.add_argument("gresource", help="Path to the built ghostcat.gresource")
+    parser.add_argument("--api-version", type=int, required=True)
+    parser.add_argument("--iterations", type=int, default=20)
+    ns = parser.parse_args(argv)
+
+    if not Gtk.init_check(None)[0]:
+        print("Cannot open a display", file=sys.stderr)
+        sys.exit(77)
+
+    Gio.Resource._register(Gio.resource_load(ns.gresource))
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from ghostcat.ghostcatd import Ratbagd, RatbagdUnavailableError
+    from ghostcat.mouseperspective import MousePerspective
+
+    try:
+        ratbagd = Ratbagd(ns.api_version)
+    except RatbagdUnavailableError:
+        print("Cannot connect to ghostcatd", file=sys.stderr)
+        sys.exit(77)
+    device = next((d for d in ratbagd.devices if len(d.profiles) > 1), None)
+    if device is None:
+        print("No device with more than one profile", file=sys.stderr)
+        sys.exit(77)
+    profiles = device.profiles[: MousePerspective.PROFILE_PAGE_CACHE_SIZE]
+
+    perspective = MousePerspective()
+    window = Gtk.Window()
+    window.add(perspective)
+    perspective.set_device(device)
+    window.show()
+
+    cold, warm = [], []
+    for i in range(ns.iterations):
+        profile = profiles[i % len(profiles)]
+        perspective._drop_profile_pages()
+        cold.append(switch_profile(perspective, profile))
+    for profile in profiles:
+        switch_profile(perspective, profile)
+    for i in range(ns.iterations):
+        warm.append(switch_profile(perspective, profiles[i % len(profiles)]))
+
+    for name, timings in (("uncached", cold), ("cached", warm)):
+        median = statistics.median(timings) * 1000
+        print(f"profile switch ({name}): {median:8.2f}ms")
+
+    window.destroy()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+# Measures the time from creating the main window to its first frame, once
+# without a cached device (the window waits for ghostcatd) and once with the
+# device cached by the previous run (the window paints the cached device and
+# connects to ghostcatd afterwards).
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# GLib reads XDG_CACHE_HOME only once, this must happen before it is loaded
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp(prefix="ghostcat-bench-")
+
+import gi  # noqa: E402
+
+gi.require_version("Gio", "2.0")
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gio, Gtk  # noqa: E402
+
+
+def time_to_first_frame(window_factory):
+    start = time.perf_counter()
+    window = window_factory()
+    elapsed = None
+
+    def on_draw(widget, cr):
+        nonlocal elapsed
+        if elapsed is None:
+            elapsed = time.perf_counter() - start
+        return False
+
+    window.connect_after("draw", on_draw)
+    window.present()
+    while elapsed is None:
+        Gtk.main_iteration()
+    # Let the window finish connecting to ghostcatd, a warm start saves the
+    # device again once it is presented
+    while Gtk.events_pending():
+        Gtk.main_iteration()
+    window.destroy()
+    return elapsed
+
+
+def clear_cache(devicecache):
+    for path in Path(devicecache.get_cache_dir()).glob("*"):
+        path.unlink()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Startup benchmark for ghostcat")
+    parser.add_argument("gresource", help="Path to the built ghostcat.gresource")
+    parser.add_argument("--api-version", type=int, required=True)
+    parser.add_argument("--iterations", type=int, default=5)
+    ns = parser.parse_args(argv)
+
+    if not Gtk.init_check(None)[0]:
+        print("Cannot open a display", file=sys.stderr)
+        sys.exit(77)
+
+    Gio.Resource._register(Gio.resource_load(ns.gresource))
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from ghostcat import devicecache
+    from ghostcat.ghostcatd import Ratbagd
+    from ghostcat.window import Window
+
+    def new_window():
+        return Window(
+            lambda: Ratbagd(ns.api_version, asynchronous=True, write_delay_ms=250)
+        )
+
+    cold, warm = [], []
+    for _ in range(ns.iterations):
+        clear_cache(devicecache)
+        cold.append(time_to_first_frame(new_window))
+        warm.append(time_to_first_frame(new_window))
+
+    if not any(Path(devicecache.get_cache_dir()).glob("*")):
+        print("No device was cached, is ghostcatd running?", file=sys.stderr)
+
+    for name, timings in (("cold", cold), ("warm", warm)):
+        median = statistics.median(timings) * 1000
+        print(f"time to first frame ({name}): {median:8.2f}ms")
+
+    shutil.rmtree(os.environ["XDG_CACHE_HOME"])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
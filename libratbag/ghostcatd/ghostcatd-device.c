@@ -221,6 +221,140 @@ static int ghostcatd_device_commit(sd_bus_message *m,
 	return 0;
 }
 
+static int ghostcatd_device_find_object(struct ghostcatd_device *device,
+				       const char *path,
+				       const sd_bus_vtable **vtable,
+				       const char **interface,
+				       void **object)
+{
+	for (size_t i = 0; i < device->n_profiles; i++) {
+		if (device->profiles[i] &&
+		    ghostcatd_profile_find_object(device->profiles[i], path,
+						vtable, interface, object))
+			return 1;
+	}
+
+	return 0;
+}
+
+static const sd_bus_vtable *
+ghostcatd_vtable_find_writable_property(const sd_bus_vtable *vtable,
+				      const char *property)
+{
+	for (; vtable->type != _SD_BUS_VTABLE_END; vtable++) {
+		if (vtable->type == _SD_BUS_VTABLE_WRITABLE_PROPERTY &&
+		    streq(vtable->x.property.member, property))
+			return vtable;
+	}
+
+	return NULL;
+}
+
+/* Walks the a{oa{sv}} of an ApplyBatch call. With apply false, only checks
+ * that every object belongs to this device and every property exists, is
+ * writable and has the right type. With apply true, passes each value to
+ * the property's setter, exactly like Properties.Set would.
+ */
+static int ghostcatd_device_walk_batch(struct ghostcatd_device *device,
+				     sd_bus_message *m,
+				     bool apply,
+				     sd_bus_error *error)
+{
+	sd_bus *bus = sd_bus_message_get_bus(m);
+	int r;
+
+	CHECK_CALL(sd_bus_message_enter_container(m, 'a', "{oa{sv}}"));
+
+	while ((r = sd_bus_message_enter_container(m, 'e', "oa{sv}")) > 0) {
+		const sd_bus_vtable *vtable = NULL;
+		const char *interface = NULL;
+		void *object = NULL;
+		const char *path;
+
+		CHECK_CALL(sd_bus_message_read(m, "o", &path));
+
+		if (!ghostcatd_device_find_object(device, path,
+						&vtable, &interface, &object))
+			return sd_bus_error_setf(error,
+						 SD_BUS_ERROR_UNKNOWN_OBJECT,
+						 "Unknown object '%s' on device %s",
+						 path, device->sysname);
+
+		CHECK_CALL(sd_bus_message_enter_container(m, 'a', "{sv}"));
+
+		while ((r = sd_bus_message_enter_container(m, 'e', "sv")) > 0) {
+			const sd_bus_vtable *prop;
+			const char *property;
+			const char *signature;
+
+			CHECK_CALL(sd_bus_message_read(m, "s", &property));
+
+			prop = ghostcatd_vtable_find_writable_property(vtable, property);
+			if (!prop)
+				return sd_bus_error_setf(error,
+							 SD_BUS_ERROR_UNKNOWN_PROPERTY,
+							 "Unknown writable property '%s' on %s",
+							 property, path);
+
+			CHECK_CALL(sd_bus_message_peek_type(m, NULL, &signature));
+			if (!streq(signature, prop->x.property.signature))
+				return sd_bus_error_setf(error,
+							 SD_BUS_ERROR_INVALID_ARGS,
+							 "Invalid type '%s' for property '%s', expected '%s'",
+							 signature, property,
+							 prop->x.property.signature);
+
+			if (apply) {
+				CHECK_CALL(sd_bus_message_enter_container(m, 'v', signature));
+				r = prop->x.property.set(bus, path, interface, property,
+							 m, object, error);
+				if (r < 0)
+					return r;
+				CHECK_CALL(sd_bus_message_exit_container(m));
+			} else {
+				CHECK_CALL(sd_bus_message_skip(m, "v"));
+			}
+
+			CHECK_CALL(sd_bus_message_exit_container(m));
+		}
+		if (r < 0)
+			return r;
+
+		CHECK_CALL(sd_bus_message_exit_container(m));
+		CHECK_CALL(sd_bus_message_exit_container(m));
+	}
+	if (r < 0)
+		return r;
+
+	CHECK_CALL(sd_bus_message_exit_container(m));
+
+	return 0;
+}
+
+static int ghostcatd_device_apply_batch(sd_bus_message *m,
+				      void *userdata,
+				      sd_bus_error *error)
+{
+	struct ghostcatd_device *device = userdata;
+	int r;
+
+	/* Validate the whole batch first so a typo doesn't leave the device
+	 * with half of the changes applied */
+	r = ghostcatd_device_walk_batch(device, m, false, error);
+	if (r < 0)
+		return r;
+
+	CHECK_CALL(sd_bus_message_rewind(m, true));
+
+	r = ghostcatd_device_walk_batch(device, m, true, error);
+	if (r < 0)
+		return r;
+
+	CHECK_CALL(sd_bus_reply_method_return(m, "u", 0));
+
+	return 0;
+}
+
 static int
 ghostcatd_device_get_model(sd_bus *bus,
 			 const char *path,
@@ -271,6 +405,7 @@ const sd_bus_vtable ghostcatd_device_vtable[] = {
 	SD_BUS_PROPERTY("FirmwareVersion", "s", ghostcatd_device_get_firmware_version, 0, SD_BUS_VTABLE_PROPERTY_CONST),
 	SD_BUS_PROPERTY("Profiles", "ao", ghostcatd_device_get_profiles, 0, SD_BUS_VTABLE_PROPERTY_CONST),
 	SD_BUS_METHOD("Commit", "", "u", ghostcatd_device_commit, SD_BUS_VTABLE_UNPRIVILEGED),
+	SD_BUS_METHOD("ApplyBatch", "a{oa{sv}}", "u", ghostcatd_device_apply_batch, SD_BUS_VTABLE_UNPRIVILEGED),
 	SD_BUS_SIGNAL("Resync", "", 0),
 	SD_BUS_VTABLE_END,
 };
@@ -851,6 +851,57 @@ unsigned int ghostcatd_profile_get_index(struct ghostcatd_profile *profile)
 	return profile->index;
 }
 
+int ghostcatd_profile_find_object(struct ghostcatd_profile *profile,
+				const char *path,
+				const sd_bus_vtable **vtable,
+				const char **interface,
+				void **object)
+{
+	unsigned int i;
+
+	assert(profile);
+	assert(path);
+
+	if (streq(path, profile->path)) {
+		*vtable = ghostcatd_profile_vtable;
+		*interface = GHOSTCATD_NAME_ROOT ".Profile";
+		*object = profile;
+		return 1;
+	}
+
+	for (i = 0; i < profile->n_resolutions; i++) {
+		if (profile->resolutions[i] &&
+		    streq(path, ghostcatd_resolution_get_path(profile->resolutions[i]))) {
+			*vtable = ghostcatd_resolution_vtable;
+			*interface = GHOSTCATD_NAME_ROOT ".Resolution";
+			*object = profile->resolutions[i];
+			return 1;
+		}
+	}
+
+	for (i = 0; i < profile->n_buttons; i++) {
+		if (profile->buttons[i] &&
+		    streq(path, ghostcatd_button_get_path(profile->buttons[i]))) {
+			*vtable = ghostcatd_button_vtable;
+			*interface = GHOSTCATD_NAME_ROOT ".Button";
+			*object = profile->buttons[i];
+			return 1;
+		}
+	}
+
+	for (i = 0; i < profile->n_leds; i++) {
+		if (profile->leds[i] &&
+		    streq(path, ghostcatd_led_get_path(profile->leds[i]))) {
+			*vtable = ghostcatd_led_vtable;
+			*interface = GHOSTCATD_NAME_ROOT ".Led";
+			*object = profile->leds[i];
+			return 1;
+		}
+	}
+
+	return 0;
+}
+
 static int ghostcatd_profile_list_resolutions(sd_bus *bus,
 					    const char *path,
 					    void *userdata,
@@ -389,6 +389,12 @@ static int ghostcatd_new(struct ghostcatd **out)
 	if (r < 0)
 		return r;
 
+	/* Lets clients fetch the whole object tree with a single
+	 * GetManagedObjects() call instead of one GetAll() per object */
+	r = sd_bus_add_object_manager(ctx->bus, NULL, GHOSTCATD_OBJ_ROOT);
+	if (r < 0)
+		return r;
+
 	r = sd_bus_add_fallback_vtable(ctx->bus,
 				       NULL,
 				       GHOSTCATD_OBJ_ROOT "/device",
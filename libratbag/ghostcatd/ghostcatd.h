@@ -109,6 +109,11 @@ int ghostcatd_for_each_led_signal(sd_bus *bus,
 				int (*func)(sd_bus *bus,
 					    struct ghostcatd_led *led));
 int ghostcatd_profile_resync(sd_bus *bus, struct ghostcatd_profile *profile);
+int ghostcatd_profile_find_object(struct ghostcatd_profile *profile,
+				const char *path,
+				const sd_bus_vtable **vtable,
+				const char **interface,
+				void **object);
 
 DEFINE_TRIVIAL_CLEANUP_FUNC(struct ghostcatd_profile *, ghostcatd_profile_free);
 